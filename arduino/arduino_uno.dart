@@ -60,6 +60,16 @@ const unsigned long SENSOR_READ_INTERVAL = 3000;
 unsigned long lastJoystickSend = 0;
 const unsigned long JOYSTICK_SEND_INTERVAL = 500;
 
+// Télémétrie binaire (activée par "TELEMETRY:BIN", lue par ArduinoManager)
+// Trame : SYNC <tag:u8><seq:u8><distance_mm:u16><light:u16><crc:u16>, petit-boutiste
+// CRC-CCITT (poly 0x1021, init 0) sur SYNC..light, identique à binascii.crc_hqx
+const uint8_t TELEMETRY_SYNC = 0xA5;
+const uint8_t TELEMETRY_TAG_SENSORS = 0x01;
+const unsigned long TELEMETRY_INTERVAL = 100;
+bool binaryTelemetry = false;
+uint8_t telemetrySeq = 0;
+unsigned long lastTelemetrySend = 0;
+
 void setup() {
   setupPins();
   
@@ -127,6 +137,7 @@ void loop() {
   
   // Capteurs avec timing
   readSensorsStable();
+  sendTelemetryFrame();
   
   // Gestion sorties
   updateBuzzer();
@@ -182,6 +193,12 @@ void handleSerialMessage(String message) {
     int duration = message.substring(8).toInt();
     startVibration(duration);
   }
+  else if (message == "TELEMETRY:BIN") {
+    binaryTelemetry = true;
+  }
+  else if (message == "TELEMETRY:TEXT") {
+    binaryTelemetry = false;
+  }
   else if (message == "BEEP") {
     startBuzzer(200, 1000);
   }
@@ -287,6 +304,54 @@ float readUltrasonic() {
   return distance / 100.0;
 }
 
+unsigned int readUltrasonicMm() {
+  digitalWrite(TRIG_PIN, LOW);
+  delayMicroseconds(2);
+  digitalWrite(TRIG_PIN, HIGH);
+  delayMicroseconds(10);
+  digitalWrite(TRIG_PIN, LOW);
+  
+  long duration = pulseIn(ECHO_PIN, HIGH, 30000);
+  return (unsigned int)(duration * 0.343 / 2);  // 0 si pas d'écho
+}
+
+uint16_t crc16Ccitt(const uint8_t* data, int len) {
+  uint16_t crc = 0;
+  for (int i = 0; i < len; i++) {
+    crc ^= (uint16_t)data[i] << 8;
+    for (int bit = 0; bit < 8; bit++) {
+      crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : crc << 1;
+    }
+  }
+  return crc;
+}
+
+void sendTelemetryFrame() {
+  unsigned long currentTime = millis();
+  
+  if (!binaryTelemetry || currentTime - lastTelemetrySend < TELEMETRY_INTERVAL) {
+    return;
+  }
+  
+  unsigned int distanceMm = readUltrasonicMm();
+  unsigned int lightLevel = readLightLevel();
+  
+  uint8_t frame[9];
+  frame[0] = TELEMETRY_SYNC;
+  frame[1] = TELEMETRY_TAG_SENSORS;
+  frame[2] = telemetrySeq++;
+  frame[3] = distanceMm & 0xFF;
+  frame[4] = distanceMm >> 8;
+  frame[5] = lightLevel & 0xFF;
+  frame[6] = lightLevel >> 8;
+  uint16_t crc = crc16Ccitt(frame, 7);
+  frame[7] = crc & 0xFF;
+  frame[8] = crc >> 8;
+  Serial.write(frame, sizeof(frame));
+  
+  lastTelemetrySend = currentTime;
+}
+
 void setSystemMode(SystemMode newMode) {
   currentMode = newMode;
   Serial.print("MODE_CHANGE:");
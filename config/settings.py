@@ -1,4 +1,11 @@
 import os
+import time
+
+# Le Pi n'a que 4 cœurs : éviter que OpenBLAS, OpenMP, dlib et torch lancent chacun
+# un thread par cœur. Doit être fixé avant le premier import de numpy/cv2.
+RUNTIME_THREADS = 2
+for _var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'NUMEXPR_NUM_THREADS'):
+    os.environ.setdefault(_var, str(RUNTIME_THREADS))
 
 class Config:
     # Chemins
@@ -17,6 +24,9 @@ class Config:
     ARDUINO_PORTS = ["COM4", "COM3", "COM5", "COM6", "/dev/ttyUSB0", "/dev/ttyACM0"]
     ARDUINO_BAUDRATE = 9600
     ARDUINO_TIMEOUT = 3
+    ARDUINO_PORT_CACHE_TTL = 10.0  # Secondes avant de ré-énumérer les ports USB
+    _port_cache = None
+    _port_cache_ts = 0.0
     
     # ESP32 Double Caméra - CONFIGURATION COMPLÈTE
     ESP32_IP = "192.168.4.1"  # IP par défaut de l'ESP32 en mode AP
@@ -34,6 +44,9 @@ class Config:
     
     # Traitement
     PROCESSING_INTERVAL = 2.0
+    CV_THREADS = RUNTIME_THREADS
+    TORCH_THREADS = RUNTIME_THREADS
+    FACE_DETECTION_STRIDE = 5  # Détection faciale complète toutes les N frames
     
     # Audio
     LANGUAGE = "fr"
@@ -68,16 +81,37 @@ class Config:
 
 
     
+    @classmethod
+    def apply_runtime(cls):
+        """Limiter les threads d'OpenCV et de torch (à appeler une fois au démarrage)"""
+        import cv2
+        cv2.setNumThreads(cls.CV_THREADS)
+        try:
+            import torch
+            torch.set_num_threads(cls.TORCH_THREADS)
+        except ImportError:
+            pass
+    
     @classmethod
     def get_arduino_port(cls):
-        """Trouve automatiquement le port Arduino"""
+        """Trouve automatiquement le port Arduino (résultat mis en cache quelques secondes)"""
+        now = time.monotonic()
+        if cls._port_cache and now - cls._port_cache_ts < cls.ARDUINO_PORT_CACHE_TTL:
+            return cls._port_cache
+        
         import serial.tools.list_ports
         
         ports = serial.tools.list_ports.comports()
         for port in ports:
             if any(arduino_port in port.device for arduino_port in cls.ARDUINO_PORTS):
                 print(f"✅ Arduino trouvé sur: {port.device}")
+                cls._port_cache, cls._port_cache_ts = port.device, now
                 return port.device
         
         print("❌ Aucun Arduino trouvé, utilisation manuelle nécessaire")
-        return cls.ARDUINO_PORTS[0] if cls.ARDUINO_PORTS else "COM4"
\ No newline at end of file
+        return cls.ARDUINO_PORTS[0] if cls.ARDUINO_PORTS else "COM4"
+    
+    @classmethod
+    def invalidate_arduino_port_cache(cls):
+        """Forcer une nouvelle énumération des ports (branchement à chaud)"""
+        cls._port_cache = None
\ No newline at end of file
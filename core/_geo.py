@@ -0,0 +1,48 @@
+"""
+Outils géographiques partagés par les modules GPS
+"""
+import math
+from functools import lru_cache
+
+import numpy as np
+import requests
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+EARTH_RADIUS_M = 6_371_000.0
+
+# Une seule session HTTP (connexion keep-alive) pour tous les géocodages
+_SESSION = requests.Session()
+_SESSION.headers['User-Agent'] = "smart_glasses"
+
+
+@lru_cache(maxsize=256)
+def geocode(address):
+    """Coordonnées (lat, lon) d'une adresse via Nominatim, ou None si introuvable"""
+    response = _SESSION.get(NOMINATIM_URL,
+                            params={'q': address, 'format': 'json', 'limit': 1},
+                            timeout=10)
+    response.raise_for_status()
+    results = response.json()
+    if not results:
+        return None
+    return float(results[0]['lat']), float(results[0]['lon'])
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Distance orthodromique en mètres (écart < 0.5 m avec l'ellipsoïde sous 1 km)"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi * 0.5) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb * 0.5) ** 2
+    return 2.0 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def haversine_np(lat, lon, dest_lat, dest_lon):
+    """Distances en mètres de plusieurs points (tableaux lat/lon) à une destination"""
+    phi1 = np.radians(np.asarray(lat, dtype=np.float64))
+    phi2 = math.radians(dest_lat)
+    dphi = phi2 - phi1
+    dlmb = math.radians(dest_lon) - np.radians(np.asarray(lon, dtype=np.float64))
+    a = np.sin(dphi * 0.5) ** 2 + np.cos(phi1) * math.cos(phi2) * np.sin(dlmb * 0.5) ** 2
+    return 2.0 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
@@ -0,0 +1,71 @@
+"""
+Registre des modèles YOLO partagés entre les détecteurs
+"""
+import importlib.util
+import os
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4)
+def get_yolo(weights, task=None):
+    """Charger un modèle YOLO une seule fois par fichier de poids"""
+    from ultralytics import YOLO
+
+    model = YOLO(weights, task=task)
+    # Fusion Conv+BN : inférence plus rapide, résultats identiques (poids PyTorch uniquement)
+    if str(weights).endswith('.pt'):
+        model.fuse()
+    return model
+
+
+def int8_onnx_path(model_path):
+    """Chemin de l'export ONNX int8 d'un modèle (yolov8n.pt → yolov8n_int8.onnx)"""
+    return os.path.splitext(model_path)[0] + '_int8.onnx'
+
+
+def export_onnx(model_path="yolov8n.pt", imgsz=640):
+    """Exporter le modèle en ONNX (à lancer une fois, hors ligne)"""
+    from ultralytics import YOLO
+
+    return YOLO(model_path).export(format='onnx', imgsz=imgsz, simplify=True)
+
+
+def export_int8_onnx(model_path="yolov8n.pt", imgsz=640):
+    """Exporter le modèle en ONNX puis quantifier ses poids en int8"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    onnx_path = export_onnx(model_path, imgsz)
+    output_path = int8_onnx_path(model_path)
+    quantize_dynamic(onnx_path, output_path, weight_type=QuantType.QUInt8)
+    return output_path
+
+
+def load_prefer_onnx(model_path, onnx_path=None, export_imgsz=None):
+    """
+    Charger l'export ONNX (ONNXRuntime) s'il est utilisable, sinon les poids model_path
+
+    onnx_path vaut par défaut l'export int8 du modèle. Avec export_imgsz, l'export int8
+    absent est généré une seule fois puis réutilisé. Le modèle passe par get_yolo.
+    """
+    if onnx_path is None:
+        onnx_path = int8_onnx_path(model_path)
+
+    if not importlib.util.find_spec('onnxruntime'):
+        return get_yolo(model_path)
+
+    if (export_imgsz and not os.path.exists(onnx_path) and model_path.endswith('.pt')
+            and importlib.util.find_spec('onnx')):
+        try:
+            print("⚙️ Export ONNX int8 du modèle (première utilisation)...")
+            export_int8_onnx(model_path, export_imgsz)
+        except Exception as e:
+            print(f"⚠️ Export ONNX int8 impossible: {e}")
+
+    if os.path.exists(onnx_path):
+        try:
+            model = get_yolo(onnx_path, task='detect')
+            print(f"⚡ Modèle ONNX utilisé: {onnx_path}")
+            return model
+        except Exception as e:
+            print(f"⚠️ Modèle ONNX inutilisable ({e}), modèle PyTorch utilisé")
+    return get_yolo(model_path)
@@ -1,5 +1,18 @@
 import time
-from collections import deque
+import numpy as np
+
+# Seuils de gravité (m) et instruction associée à chaque tranche
+SEVERITY_EDGES = np.array([0.5, 1.0, 2.0])
+SEVERITY_INSTRUCTIONS = (
+    ("danger", "Arrêt immédiat ! Obstacle très proche"),  # < 50cm
+    ("warning", "Obstacle à {:.1f}m devant vous"),         # < 1m
+    ("info", "Obstacle à {:.1f}m"),                        # < 2m
+    None                                                   # Navigation libre
+)
+
+# Historique des distances : [gauche, centre, droite, ultrason] par mesure
+HISTORY_SIZE = 10
+CLOSING_RATE_THRESHOLD = -0.1  # m par mesure, en dessous l'obstacle se rapproche
 
 class AdvancedNavigation:
     def __init__(self, stereo_vision, arduino_comm, voice_assistant):
@@ -7,8 +20,9 @@ class AdvancedNavigation:
         self.arduino_comm = arduino_comm
         self.voice_assistant = voice_assistant
         
-        # Mémoire de navigation
-        self.obstacle_history = deque(maxlen=10)
+        # Mémoire de navigation (tampon circulaire préalloué)
+        self.obstacle_history = np.full((HISTORY_SIZE, 4), np.inf, dtype=np.float32)
+        self._history_idx = 0
         self.last_detection_time = 0
         self.navigation_mode = "auto"  # auto, manual, avoid
         
@@ -28,32 +42,61 @@ class AdvancedNavigation:
         if ultrasonic_distance:
             environment_data["ultrasonic"] = ultrasonic_distance
         
+        self._record_history(environment_data)
         return environment_data
     
+    def _record_history(self, environment_data):
+        """Enregistrer les distances courantes dans le tampon circulaire"""
+        stereo_data = environment_data.get("stereo", {})
+        self.obstacle_history[self._history_idx % HISTORY_SIZE] = (
+            stereo_data.get("gauche", np.inf),
+            stereo_data.get("centre", np.inf),
+            stereo_data.get("droite", np.inf),
+            environment_data.get("ultrasonic", np.inf)
+        )
+        self._history_idx += 1
+    
+    def get_closing_rate(self):
+        """Pente de la distance minimale sur l'historique (m par mesure, négatif = approche)"""
+        count = min(self._history_idx, HISTORY_SIZE)
+        if count < 3:
+            return 0.0
+        
+        # Remettre l'historique dans l'ordre chronologique
+        recent = np.roll(self.obstacle_history, -(self._history_idx % HISTORY_SIZE), axis=0)[-count:]
+        nearest = recent.min(axis=1)
+        finite = np.isfinite(nearest)
+        if finite.sum() < 3:
+            return 0.0
+        
+        return float(np.polyfit(np.arange(count)[finite], nearest[finite], 1)[0])
+    
     def generate_navigation_instructions(self, environment_data):
         """Générer des instructions de navigation intelligentes"""
         instructions = []
         
-        # Fusion des données des capteurs
+        # Fusion des données des capteurs : [gauche, centre, droite, ultrason]
         stereo_data = environment_data.get("stereo", {})
-        ultrasonic_data = environment_data.get("ultrasonic", float('inf'))
+        distances = np.array([
+            stereo_data.get("gauche", np.inf),
+            stereo_data.get("centre", np.inf),
+            stereo_data.get("droite", np.inf),
+            environment_data.get("ultrasonic", np.inf)
+        ], dtype=np.float32)
+        left_dist, centre_dist, right_dist = distances[:3]
         
         # Détection des obstacles critiques
-        min_distance = min([
-            stereo_data.get("centre", float('inf')),
-            stereo_data.get("gauche", float('inf')), 
-            stereo_data.get("droite", float('inf')),
-            ultrasonic_data
-        ])
+        min_distance = float(distances.min())
+        severity = int(np.searchsorted(SEVERITY_EDGES, min_distance, side='right'))
+        instruction = SEVERITY_INSTRUCTIONS[severity]
         
         # Générer instructions selon les distances
-        if min_distance < 0.5:  # 50cm - DANGER
-            instructions.append(("danger", "Arrêt immédiat ! Obstacle très proche"))
+        if instruction is not None:
+            level, template = instruction
+            instructions.append((level, template.format(min_distance)))
             
+        if severity == 0:
             # Chercher la meilleure direction d'évitement
-            left_dist = stereo_data.get("gauche", float('inf'))
-            right_dist = stereo_data.get("droite", float('inf'))
-            
             if left_dist > right_dist and left_dist > 1.0:
                 instructions.append(("warning", "Contournez par la gauche"))
             elif right_dist > left_dist and right_dist > 1.0:
@@ -61,17 +104,13 @@ class AdvancedNavigation:
             else:
                 instructions.append(("warning", "Reculez prudemment"))
                 
-        elif min_distance < 1.0:  # 1m - ALERTE
-            instructions.append(("warning", f"Obstacle à {min_distance:.1f}m devant vous"))
-            
-        elif min_distance < 2.0:  # 2m - INFORMATION
-            instructions.append(("info", f"Obstacle à {min_distance:.1f}m"))
+        # Obstacle qui se rapproche rapidement : prévenir avant la zone de danger
+        elif self.get_closing_rate() < CLOSING_RATE_THRESHOLD:
+            instructions.append(("warning", "Obstacle en approche"))
             
         # Navigation libre
-        else:
-            centre_dist = stereo_data.get("centre", float('inf'))
-            if centre_dist > 3.0:
-                instructions.append(("info", "Chemin libre devant vous"))
+        elif instruction is None and centre_dist > 3.0:
+            instructions.append(("info", "Chemin libre devant vous"))
         
         return instructions
     
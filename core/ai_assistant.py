@@ -1,5 +1,36 @@
+import re
 import time
 
+# Mots-clés par intention, dans l'ordre de priorité
+INTENT_KEYWORDS = (
+    ("face", ("qui est", "reconnais")),
+    ("object", ("quoi", "objet")),
+    ("text", ("texte", "lire")),
+    ("help", ("aide", "que peux-tu")),
+    ("navigation", ("navigation", "déplacer")),
+)
+
+INTENT_RESPONSES = {
+    "face": "Je peux reconnaître les personnes si elles sont dans ma base de données",
+    "object": "Je peux détecter les objets autour de vous comme les personnes, chaises, voitures, etc.",
+    "text": "Je peux lire le texte visible devant vous",
+    "help": "Je peux reconnaître les objets, les visages, lire du texte, vous aider à naviguer et répondre à vos questions",
+    "navigation": "Utilisez le joystick pour vous déplacer. Je vous préviendrai des obstacles",
+}
+
+DEFAULT_RESPONSE = "Je suis votre assistant pour les lunettes intelligentes. Je peux reconnaître les objets, les visages et lire du texte"
+
+# Une seule expression pour tous les mots-clés : un seul passage sur la question
+_KEYWORD_RANK = {
+    keyword: (rank, intent)
+    for rank, (intent, keywords) in enumerate(INTENT_KEYWORDS)
+    for keyword in keywords
+}
+_INTENT_RE = re.compile(
+    "|".join(re.escape(keyword) for keyword in sorted(_KEYWORD_RANK, key=len, reverse=True)),
+    re.IGNORECASE
+)
+
 class AIAssistant:
     def __init__(self, voice_assistant):
         self.voice_assistant = voice_assistant
@@ -15,26 +46,13 @@ class AIAssistant:
         
         self.last_question_time = current_time
         
-        # Questions simples prédéfinies
-        question_lower = question.lower()
-        
-        if "qui est" in question_lower or "reconnais" in question_lower:
-            return "Je peux reconnaître les personnes si elles sont dans ma base de données"
-        
-        elif "quoi" in question_lower or "objet" in question_lower:
-            return "Je peux détecter les objets autour de vous comme les personnes, chaises, voitures, etc."
-        
-        elif "texte" in question_lower or "lire" in question_lower:
-            return "Je peux lire le texte visible devant vous"
-        
-        elif "aide" in question_lower or "que peux-tu" in question_lower:
-            return "Je peux reconnaître les objets, les visages, lire du texte, vous aider à naviguer et répondre à vos questions"
-        
-        elif "navigation" in question_lower or "déplacer" in question_lower:
-            return "Utilisez le joystick pour vous déplacer. Je vous préviendrai des obstacles"
+        # Questions simples prédéfinies : l'intention la plus prioritaire l'emporte
+        matches = [_KEYWORD_RANK[m.group(0).lower()] for m in _INTENT_RE.finditer(question)]
+        if not matches:
+            return DEFAULT_RESPONSE
         
-        else:
-            return "Je suis votre assistant pour les lunettes intelligentes. Je peux reconnaître les objets, les visages et lire du texte"
+        _, intent = min(matches)
+        return INTENT_RESPONSES[intent]
 
     def ask_question(self, question):
         """Poser une question à l'assistant IA"""
@@ -2,17 +2,51 @@ import cv2
 import face_recognition
 import numpy as np
 import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from config.settings import Config
+from core.frame_pyramid import FramePyramid
+
+try:
+    import dlib
+    DLIB_USE_CUDA = bool(dlib.DLIB_USE_CUDA)
+except (ImportError, AttributeError):
+    DLIB_USE_CUDA = False
+
 class FaceRecognizer:
-    def __init__(self, known_faces_path="known_faces"):
+    CACHE_FILENAME = ".encodings.pkl"
+    DETECTION_SCALE = 4  # Détection HOG sur le niveau 1/4 de la pyramide
+
+    def __init__(self, known_faces_path="known_faces", detect_every=None):
         print("👤 Initialisation reconnaissance faciale avancée...")
         self.known_faces_path = known_faces_path
         self.known_face_encodings = []
         self.known_face_names = []
+        self.known_encodings = np.empty((0, 128), dtype=np.float32)
+        self._known_sq_norms = np.empty(0, dtype=np.float32)
+        self._cache_path = Path(known_faces_path) / self.CACHE_FILENAME
+        
+        # Tampons réutilisés d'une frame à l'autre
+        self._small_rgb_buf = None
+        self._rgb_buf = None
+        self._overlay_buf = None
+        
+        # Avec un dlib compilé CUDA, détecteur CNN et encodeur ResNet tournent sur le GPU
+        self._detection_model = 'cnn' if DLIB_USE_CUDA else 'hog'
+        
+        # Sous-échantillonnage temporel : détection complète toutes les N frames
+        self._detect_every = max(1, detect_every or Config.FACE_DETECTION_STRIDE)
+        self._frame_idx = 0
+        self._last_faces = []
+        
+        # Signature de la dernière frame analysée (plusieurs appels sur la même frame)
+        self._last_frame_sig = None
         
         # Charger les visages connus
         self.load_known_faces()
+        self._stack_known_encodings()
         print(f"✅ {len(self.known_face_names)} visages chargés depuis '{known_faces_path}'")
 
     def load_known_faces(self):
@@ -23,67 +57,177 @@ class FaceRecognizer:
             return
 
         supported_formats = ('.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG')
+        image_files = sorted(p for p in Path(self.known_faces_path).iterdir()
+                             if p.suffix.lower() in supported_formats)
         
-        for file_path in Path(self.known_faces_path).iterdir():
-            if file_path.suffix.lower() in supported_formats:
-                try:
-                    # Charger l'image
-                    image = face_recognition.load_image_file(str(file_path))
-                    
-                    # Détecter les encodages faciaux
-                    face_encodings = face_recognition.face_encodings(image)
+        # Réutiliser le cache si aucune image n'a changé
+        signature = tuple((p.name, p.stat().st_mtime_ns) for p in image_files)
+        if self._load_cache(signature):
+            print(f"  ⚡ Encodages chargés depuis le cache ({len(self.known_face_names)} visages)")
+            return
+        
+        # Charger toutes les images avant de lancer dlib
+        images = []
+        image_paths = []
+        for file_path in image_files:
+            try:
+                images.append(face_recognition.load_image_file(str(file_path)))
+                image_paths.append(file_path)
+            except Exception as e:
+                print(f"  ❌ Erreur chargement {file_path.name}: {e}")
+        
+        if not images:
+            return
+        
+        # Localiser les visages de toutes les images en une passe
+        all_locations = self._locate_faces_batch(images)
+        
+        for file_path, image, locations in zip(image_paths, images, all_locations):
+            try:
+                if len(locations) > 0:
+                    # Encoder uniquement le premier visage détecté
+                    face_encodings = face_recognition.face_encodings(
+                        image, known_face_locations=locations[:1], num_jitters=1)
+                    self.known_face_encodings.append(face_encodings[0])
+                    self.known_face_names.append(file_path.stem)  # Nom du fichier sans extension
+                    print(f"  ✅ Visage chargé: {file_path.stem}")
+                else:
+                    print(f"  ⚠️ Aucun visage détecté dans: {file_path.name}")
                     
-                    if len(face_encodings) > 0:
-                        # Prendre le premier visage détecté
-                        self.known_face_encodings.append(face_encodings[0])
-                        self.known_face_names.append(file_path.stem)  # Nom du fichier sans extension
-                        print(f"  ✅ Visage chargé: {file_path.stem}")
-                    else:
-                        print(f"  ⚠️ Aucun visage détecté dans: {file_path.name}")
-                        
-                except Exception as e:
-                    print(f"  ❌ Erreur chargement {file_path.name}: {e}")
+            except Exception as e:
+                print(f"  ❌ Erreur chargement {file_path.name}: {e}")
+        
+        self._save_cache(signature)
+
+    def _stack_known_encodings(self):
+        """Empiler les encodages connus en une matrice (N, 128) contiguë"""
+        if self.known_face_encodings:
+            self.known_encodings = np.ascontiguousarray(
+                np.stack(self.known_face_encodings), dtype=np.float32)
+        else:
+            self.known_encodings = np.empty((0, 128), dtype=np.float32)
+        self._known_sq_norms = np.einsum('ij,ij->i', self.known_encodings, self.known_encodings)
+
+    def _load_cache(self, signature):
+        """Charger les encodages depuis le cache si la signature du dossier correspond"""
+        if not self._cache_path.exists():
+            return False
+        
+        try:
+            with open(self._cache_path, 'rb') as f:
+                encodings, names, cached_signature = pickle.load(f)
+        except Exception as e:
+            print(f"  ⚠️ Cache des visages illisible: {e}")
+            return False
+        
+        if cached_signature != signature:
+            return False
+        
+        self.known_face_encodings = list(encodings)
+        self.known_face_names = list(names)
+        return True
+
+    def _save_cache(self, signature):
+        """Sauvegarder les encodages avec la signature du dossier"""
+        encodings = (np.stack(self.known_face_encodings) if self.known_face_encodings
+                     else np.empty((0, 128)))
+        try:
+            with open(self._cache_path, 'wb') as f:
+                pickle.dump((encodings, self.known_face_names, signature), f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            print(f"  ⚠️ Impossible d'écrire le cache des visages: {e}")
+
+    def _locate_faces_batch(self, images, batch_size=16):
+        """Localiser les visages de plusieurs images (batch GPU ou pool de threads)"""
+        if DLIB_USE_CUDA:
+            # batch_face_locations exige des images de même taille
+            locations = [None] * len(images)
+            by_shape = {}
+            for i, image in enumerate(images):
+                by_shape.setdefault(image.shape, []).append(i)
+            for indices in by_shape.values():
+                batch = face_recognition.batch_face_locations(
+                    [images[i] for i in indices], batch_size=batch_size)
+                for i, locs in zip(indices, batch):
+                    locations[i] = locs
+            return locations
+        
+        # dlib libère le GIL pendant la détection HOG
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+            return list(executor.map(face_recognition.face_locations, images))
 
     def detect_faces(self, frame):
-        """Détecter et reconnaître les visages dans une frame"""
+        """Détecter et reconnaître les visages dans une frame (ou une FramePyramid)"""
         if len(self.known_face_encodings) == 0:
             return []
 
+        pyramid = FramePyramid.wrap(frame)
+
+        # Même frame que l'appel précédent : renvoyer le résultat en cache
+        sig = hash(cv2.resize(pyramid.full, (16, 16), interpolation=cv2.INTER_AREA).tobytes())
+        if sig == self._last_frame_sig:
+            return self._last_faces
+        self._last_frame_sig = sig
+
+        # Entre deux détections, les visages bougent peu : réutiliser le dernier résultat
+        run_detection = self._frame_idx % self._detect_every == 0
+        self._frame_idx += 1
+        if not run_detection:
+            return self._last_faces
+
+        self._last_faces = self._detect_and_recognize(pyramid)
+        return self._last_faces
+
+    def _detect_and_recognize(self, pyramid):
+        """Détection et reconnaissance complètes sur une frame"""
         try:
-            # Redimensionner pour améliorer les performances
-            small_frame = cv2.resize(frame, (0, 0), fx=0.5, fy=0.5)
-            rgb_small_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
+            # Localiser les visages (HOG, ou CNN sur GPU) sur l'image réduite au quart
+            frame = pyramid.full
+            small_frame = pyramid.quarter
+            scale = self.DETECTION_SCALE
+            if self._small_rgb_buf is None or self._small_rgb_buf.shape != small_frame.shape:
+                self._small_rgb_buf = np.empty_like(small_frame)
+            rgb_small_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB, dst=self._small_rgb_buf)
+            small_locations = face_recognition.face_locations(rgb_small_frame, model=self._detection_model)
+
+            # Pas de visage : inutile de lancer l'encodeur
+            if not small_locations:
+                return []
 
-            # Détecter tous les visages dans l'image
-            face_locations = face_recognition.face_locations(rgb_small_frame)
-            face_encodings = face_recognition.face_encodings(rgb_small_frame, face_locations)
+            # Encoder à pleine résolution, uniquement dans les boîtes détectées
+            face_locations = [(top * scale, right * scale, bottom * scale, left * scale)
+                              for (top, right, bottom, left) in small_locations]
+            if self._rgb_buf is None or self._rgb_buf.shape != frame.shape:
+                self._rgb_buf = np.empty_like(frame)
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
+            face_encodings = face_recognition.face_encodings(rgb_frame, known_face_locations=face_locations)
 
             face_names = []
             face_confidences = []
 
-            for face_encoding in face_encodings:
-                # Comparer avec les visages connus
-                matches = face_recognition.compare_faces(self.known_face_encodings, face_encoding)
-                name = "Inconnu"
-                confidence = 0.0
+            if face_encodings:
+                # Distances à tous les visages connus en un seul produit matriciel
+                queries = np.asarray(face_encodings, dtype=np.float32)
+                sq_dists = (np.einsum('ij,ij->i', queries, queries)[:, None]
+                            + self._known_sq_norms[None, :]
+                            - 2.0 * queries @ self.known_encodings.T)
+                best_indices = sq_dists.argmin(axis=1)
+                best_dists = np.sqrt(np.maximum(
+                    sq_dists[np.arange(len(queries)), best_indices], 0.0))
 
-                # Calculer les distances
-                face_distances = face_recognition.face_distance(self.known_face_encodings, face_encoding)
-                if len(face_distances) > 0:
-                    best_match_index = np.argmin(face_distances)
-                    if matches[best_match_index]:
-                        name = self.known_face_names[best_match_index]
-                        confidence = 1 - face_distances[best_match_index]
-
-                face_names.append(name)
-                face_confidences.append(confidence)
+                for best_index, distance in zip(best_indices, best_dists):
+                    # Même tolérance que face_recognition.compare_faces (0.6)
+                    if distance <= 0.6:
+                        face_names.append(self.known_face_names[best_index])
+                        face_confidences.append(float(1 - distance))
+                    else:
+                        face_names.append("Inconnu")
+                        face_confidences.append(0.0)
 
-            # Convertir les coordonnées vers l'image originale
+            # Les coordonnées sont déjà celles de l'image originale
             results = []
             for (top, right, bottom, left), name, confidence in zip(face_locations, face_names, face_confidences):
-                # Multiplier par 2 car on a redimensionné à 0.5
-                top *= 2; right *= 2; bottom *= 2; left *= 2
-                
                 results.append({
                     'bbox': (left, top, right - left, bottom - top),
                     'name': name,
@@ -98,6 +242,16 @@ class FaceRecognizer:
 
     def draw_faces(self, frame, faces):
         """Dessiner les rectangles et noms sur la frame"""
+        if not faces:
+            return frame
+        
+        # Tout dessiner dans un calque réutilisé, puis une seule copie vers la frame
+        if self._overlay_buf is None or self._overlay_buf.shape != frame.shape:
+            self._overlay_buf = np.zeros_like(frame)
+        else:
+            self._overlay_buf.fill(0)
+        overlay = self._overlay_buf
+        
         for face in faces:
             left, top, width, height = face['bbox']
             right = left + width
@@ -110,12 +264,24 @@ class FaceRecognizer:
                 color = (0, 255, 0)  # Vert pour connu
             
             # Rectangle autour du visage
-            cv2.rectangle(frame, (left, top), (right, bottom), color, 2)
+            cv2.rectangle(overlay, (left, top), (right, bottom), color, 2)
             
             # Étiquette avec nom et confiance
             label = f"{face['name']} ({face['confidence']:.2f})"
-            cv2.rectangle(frame, (left, bottom - 35), (right, bottom), color, cv2.FILLED)
-            cv2.putText(frame, label, (left + 6, bottom - 6), 
+            cv2.rectangle(overlay, (left, bottom - 35), (right, bottom), color, cv2.FILLED)
+            cv2.putText(overlay, label, (left + 6, bottom - 6), 
                        cv2.FONT_HERSHEY_DUPLEX, 0.6, (255, 255, 255), 1)
         
-        return frame
\ No newline at end of file
+        # Les pixels noirs du calque sont transparents
+        np.copyto(frame, overlay, where=overlay.any(axis=2, keepdims=True))
+        return frame
+
+
+_singleton = None
+
+def get_face_recognizer():
+    """Instance partagée : les visages connus ne sont chargés qu'une seule fois"""
+    global _singleton
+    if _singleton is None:
+        _singleton = FaceRecognizer()
+    return _singleton
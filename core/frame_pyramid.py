@@ -0,0 +1,36 @@
+"""
+Pyramide d'images calculée une fois par frame et partagée entre les détecteurs
+"""
+from functools import cached_property
+
+import cv2
+
+
+class FramePyramid:
+    """Frame pleine résolution et ses réductions 1/2 et 1/4, calculées à la demande"""
+
+    def __init__(self, frame):
+        self.full = frame
+
+    @classmethod
+    def wrap(cls, frame):
+        """Accepter indifféremment une frame brute ou une pyramide déjà construite"""
+        return frame if isinstance(frame, cls) else cls(frame)
+
+    @cached_property
+    def half(self):
+        return cv2.resize(self.full, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA)
+
+    @cached_property
+    def quarter(self):
+        # Réduit depuis la moitié : deux fois moins de pixels à lire que depuis la frame
+        return cv2.resize(self.half, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA)
+
+    def level_for(self, size):
+        """Plus petit niveau dont le grand côté reste >= size, avec son facteur d'échelle"""
+        long_side = max(self.full.shape[:2])
+        if long_side // 4 >= size:
+            return self.quarter, 4
+        if long_side // 2 >= size:
+            return self.half, 2
+        return self.full, 1
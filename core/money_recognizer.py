@@ -1,15 +1,25 @@
+import logging
 import cv2
 import numpy as np
-import torch
-from ultralytics import YOLO
+
+from core._model_registry import export_onnx as export_yolo_onnx, load_prefer_onnx
+from core.frame_pyramid import FramePyramid
+
+MODEL_PATH = 'money_detection.pt'
+ONNX_MODEL_PATH = 'money_detection.onnx'
+logger = logging.getLogger(__name__)
+
+INFERENCE_SIZE = 416  # Taille d'entrée réduite : coût quadratique en imgsz
+LABEL_TEXT_COLOR = (1, 1, 1)  # Quasi-noir : le noir pur est transparent dans le calque
 
 class MoneyRecognizer:
     def __init__(self):
         print("💰 Initialisation reconnaissance de billets...")
         
         # Modèle custom pour billets (à entraîner)
-        self.model = YOLO('money_detection.pt')  # Modèle custom
+        self.model = self._load_model()
         self.confidence_threshold = 0.6
+        self._overlay_buf = None
         
         # Caractéristiques des billets euros
         self.euro_characteristics = {
@@ -22,35 +32,51 @@ class MoneyRecognizer:
             "500": {"color": "violet", "size": "160x82mm"}
         }
         
+    def _load_model(self):
+        """Charger l'export ONNX s'il existe (ONNXRuntime), sinon le modèle PyTorch"""
+        return load_prefer_onnx(MODEL_PATH, ONNX_MODEL_PATH)
+
+    @staticmethod
+    def export_onnx(weights=MODEL_PATH, imgsz=INFERENCE_SIZE):
+        """Exporter le modèle en ONNX (à lancer une fois, hors ligne)"""
+        return export_yolo_onnx(weights, imgsz)
+
     def detect_money(self, frame):
-        """Détecter les billets dans l'image"""
+        """Détecter les billets dans l'image (frame brute ou FramePyramid)"""
         try:
-            # Redimensionner pour performance
-            input_frame = cv2.resize(frame, (640, 480))
+            # Plus petit niveau de la pyramide suffisant pour la taille d'inférence
+            pyramid = FramePyramid.wrap(frame)
+            frame = pyramid.full
+            input_frame, scale = pyramid.level_for(INFERENCE_SIZE)
             
             # Détection avec YOLO
-            results = self.model(input_frame, conf=0.5, verbose=False)
+            results = self.model(input_frame, conf=0.5, imgsz=INFERENCE_SIZE, verbose=False)
             
             money_detections = []
             
-            for result in results:
-                boxes = result.boxes
-                for box in boxes:
-                    confidence = float(box.conf[0])
-                    class_id = int(box.cls[0])
-                    
-                    # Estimation de la valeur basée sur la taille/forme
-                    bbox = box.xyxy[0].tolist()
-                    value = self.estimate_money_value(bbox, frame)
-                    
-                    money_detections.append({
-                        'value': value,
-                        'confidence': confidence,
-                        'bbox': bbox,
-                        'currency': 'EUR'
-                    })
-                    
-                    print(f"💰 Détection: {value}€ (confiance: {confidence:.2f})")
+            if not results or len(results[0].boxes) == 0:
+                return money_detections
+            
+            # Un seul transfert vers le CPU pour toutes les boîtes
+            boxes = results[0].boxes
+            xyxy = boxes.xyxy.cpu().numpy() * scale  # Coordonnées de la frame pleine résolution
+            confidences = boxes.conf.cpu().numpy()
+            
+            for i in range(len(xyxy)):
+                confidence = float(confidences[i])
+                
+                # Estimation de la valeur basée sur la taille/forme
+                bbox = xyxy[i].tolist()
+                value = self.estimate_money_value(bbox, frame)
+                
+                money_detections.append({
+                    'value': value,
+                    'confidence': confidence,
+                    'bbox': bbox,
+                    'currency': 'EUR'
+                })
+                
+                logger.debug("💰 Détection: %s€ (confiance: %.2f)", value, confidence)
             
             return money_detections
             
@@ -66,9 +92,10 @@ class MoneyRecognizer:
         if roi.size == 0:
             return "inconnu"
         
-        # Analyser les couleurs dominantes
-        hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
-        dominant_color = np.mean(hsv[:, :, 0])
+        # Analyser les couleurs dominantes sur une vignette 32x32 (la moyenne suffit)
+        roi_small = cv2.resize(roi, (32, 32), interpolation=cv2.INTER_AREA)
+        hsv = cv2.cvtColor(roi_small, cv2.COLOR_BGR2HSV)
+        dominant_color = cv2.mean(hsv)[0]
         
         # Estimer basé sur la taille relative
         width = x2 - x1
@@ -92,6 +119,16 @@ class MoneyRecognizer:
 
     def draw_money_detections(self, frame, detections):
         """Dessiner les détections de billets"""
+        if not detections:
+            return
+        
+        # Tout dessiner dans un calque réutilisé, puis une seule copie vers la frame
+        if self._overlay_buf is None or self._overlay_buf.shape != frame.shape:
+            self._overlay_buf = np.zeros_like(frame)
+        else:
+            self._overlay_buf.fill(0)
+        overlay = self._overlay_buf
+        
         for det in detections:
             bbox = det['bbox']
             value = det['value']
@@ -100,16 +137,19 @@ class MoneyRecognizer:
             x1, y1, x2, y2 = map(int, bbox)
             
             # Bounding box verte pour l'argent
-            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 3)
+            cv2.rectangle(overlay, (x1, y1), (x2, y2), (0, 255, 0), 3)
             
             # Label
             label = f"{value}€ ({confidence:.2f})"
             label_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)[0]
             
             # Fond du label
-            cv2.rectangle(frame, (x1, y1 - label_size[1] - 10), 
+            cv2.rectangle(overlay, (x1, y1 - label_size[1] - 10), 
                          (x1 + label_size[0], y1), (0, 255, 0), -1)
             
             # Texte
-            cv2.putText(frame, label, (x1, y1 - 5), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
\ No newline at end of file
+            cv2.putText(overlay, label, (x1, y1 - 5), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, LABEL_TEXT_COLOR, 2)
+        
+        # Les pixels noirs du calque sont transparents
+        np.copyto(frame, overlay, where=overlay.any(axis=2, keepdims=True))
\ No newline at end of file
@@ -1,5 +1 @@
-<<<<<<< HEAD
- 
-=======
  
->>>>>>> 8b3abaa (Major update: Complete smart glasses system)
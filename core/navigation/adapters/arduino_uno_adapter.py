@@ -2,14 +2,29 @@
 Adaptateur spécifique pour l'Arduino Uno du projet smart-glasses.
 Correspond exactement au code Arduino fourni.
 """
+import os
+import select
 import serial
 import time
 import logging
 import threading
+import queue
 
 logger = logging.getLogger(__name__)
 
+RX_BUFFER_SIZE = 4096  # Tampon de réception alloué une seule fois
+
 class ArduinoUnoAdapter:
+    # Index = numéro de mode envoyé par l'Arduino
+    MODE_NAMES = ("NAVIGATION", "OBJECT_DETECTION", "FACE_RECOGNITION", "TEXT_READING", "AI_ASSISTANT")
+    
+    # Commandes sans réponse attendue, préencodées
+    _BEEP_BYTES = b"BEEP\n"
+    _MODE_BYTES = tuple(b"MODE:%d\n" % mode for mode in range(len(MODE_NAMES)))
+    _BUZZ_TMPL = b"BUZZER:%d:%d\n"
+    _VIBRATE_TMPL = b"VIBRATE:%d\n"
+    HEALTH_TIMEOUT = 5.0  # Secondes sans aucune ligne reçue avant d'interroger l'Arduino
+    
     def __init__(self, port='/dev/ttyUSB0', baudrate=9600, timeout=1):
         """
         Adaptateur pour l'Arduino Uno avec le code ultra-stable.
@@ -23,21 +38,42 @@ class ArduinoUnoAdapter:
         self.baudrate = baudrate
         self.timeout = timeout
         self.serial_conn = None
+        self._fd = None  # Descripteur série (POSIX) pour les écritures directes
         
         # Données
         self.last_distance = None      # en centimètres
-        self.last_light_level = None   # 0-1023
-        self.last_distance_time = 0
-        self.last_light_time = 0
+        self.last_distance_time = 0    # Horloge monotone
+        # (niveau 0-1023, heure) publiés ensemble par une seule affectation :
+        # le lecteur ne voit jamais un niveau avec l'heure d'une autre mesure
+        self._light_state = (None, 0)
+        self._now = time.monotonic
+        self._rx_time = 0              # Heure du dernier réveil du thread de lecture
+        self._last_line_time = 0       # Heure de la dernière ligne complète reçue
         
         # Gestion des commandes
         self.command_lock = threading.Lock()
         self.command_response = None
         self.command_waiting = False
+        self._response_queue = queue.Queue()  # Lignes transmises par le thread de lecture
         
         # Thread de lecture passive
         self.reading_thread = None
         self.running = False
+        self._rxbuf = bytearray(RX_BUFFER_SIZE)  # Réception via readinto, sans bytes intermédiaire
+        self._rxview = memoryview(self._rxbuf)
+        self._rxlen = 0                          # Octets valides en tête de _rxbuf
+        self._stop_r = None        # Self-pipe réveillant select() à l'arrêt (POSIX)
+        self._stop_w = None
+        
+        # Messages automatiques : préfixe avant ':' → traitement
+        # Les lignes restent en bytes : int() les accepte sans décodage
+        self._handlers = {
+            b'LIGHT_LEVEL': self._on_light_level,
+            b'MODE_CHANGE': self._on_mode_change,
+            b'BUTTON': self._on_button,
+            b'JOYSTICK': None,  # Format: "JOYSTICK:xValue,yValue" - ignoré pour le moment
+            b'ARDUINO_READY': self._on_ready,
+        }
         
         self._connect()
         
@@ -53,6 +89,10 @@ class ArduinoUnoAdapter:
                 timeout=self.timeout,
                 write_timeout=self.timeout
             )
+            # pyserial ouvre déjà le port en O_NONBLOCK sous POSIX
+            if os.name == 'posix':
+                self._fd = self.serial_conn.fileno()
+            
             time.sleep(2)  # Laisser l'Arduino démarrer (startupSequence)
             
             # Vider le buffer initial
@@ -66,9 +106,9 @@ class ArduinoUnoAdapter:
             logger.error(f"Erreur connexion Arduino: {e}")
             self.serial_conn = None
     
-    def _send_command(self, command):
+    def _send_query(self, command):
         """
-        Envoie une commande à l'Arduino.
+        Envoie une commande à l'Arduino et attend sa réponse.
         
         Format attendu par handleSerialMessage():
         - "GET_ULTRASONIC" → répond "DISTANCE:xxx"
@@ -88,82 +128,162 @@ class ArduinoUnoAdapter:
                 if not command.endswith('\n'):
                     command += '\n'
                 
-                # Vider le buffer d'entrée
-                self.serial_conn.reset_input_buffer()
+                # Oublier les lignes arrivées avant la commande
+                while not self._response_queue.empty():
+                    self._response_queue.get_nowait()
+                
+                # Le thread de lecture transmet les lignes tant que command_waiting est vrai
+                reader_active = self.reading_thread is not None and self.reading_thread.is_alive()
+                self.command_waiting = reader_active
                 
                 # Envoyer la commande
                 self.serial_conn.write(command.encode())
                 logger.debug(f"Commande envoyée: {command.strip()}")
                 
-                # Attendre la réponse (avec timeout)
-                start_time = time.time()
-                response = None
-                
-                while time.time() - start_time < self.timeout:
-                    if self.serial_conn.in_waiting:
-                        line = self.serial_conn.readline().decode('utf-8', errors='ignore').strip()
-                        if line:
-                            response = line
-                            break
-                    time.sleep(0.01)
+                # Attendre la réponse : lecture bloquante jusqu'à '\n' ou timeout
+                if reader_active:
+                    try:
+                        return self._response_queue.get(timeout=self.timeout)
+                    except queue.Empty:
+                        return None
                 
-                return response
+                line = self.serial_conn.readline().decode('ascii', 'ignore').rstrip()
+                return line or None
                 
             except Exception as e:
                 logger.error(f"Erreur envoi commande '{command}': {e}")
                 return None
+            finally:
+                self.command_waiting = False
+    
+    def _send_fire(self, command_bytes):
+        """Envoie une commande déjà encodée sans attendre de réponse."""
+        if not self.serial_conn:
+            logger.warning("Connexion série non disponible")
+            return False
+        
+        try:
+            if self._fd is None:
+                self.serial_conn.write(command_bytes)
+                return True
+            
+            # Quelques octets tiennent dans le tampon tty : os.write rend la main
+            # aussitôt, sans la boucle select() de Serial.write
+            try:
+                written = os.write(self._fd, command_bytes)
+            except BlockingIOError:
+                select.select([], [self._fd], [], 0.001)  # Tampon plein : une seule nouvelle tentative
+                written = os.write(self._fd, command_bytes)
+            if written < len(command_bytes):
+                self.serial_conn.write(command_bytes[written:])
+            return True
+        except Exception as e:
+            logger.error(f"Erreur envoi commande {command_bytes!r}: {e}")
+            return False
     
     def _reading_loop(self):
         """Boucle de lecture passive pour les messages automatiques."""
+        use_select = self._stop_r is not None
+        
         while self.running and self.serial_conn:
             try:
-                if self.serial_conn.in_waiting:
-                    line = self.serial_conn.readline().decode('utf-8', errors='ignore').strip()
-                    
-                    if line:
-                        logger.debug(f"Message Arduino: {line}")
-                        
-                        # Traiter les messages automatiques
-                        if line.startswith("LIGHT_LEVEL:"):
-                            try:
-                                light = int(line.split(":")[1])
-                                self.last_light_level = light
-                                self.last_light_time = time.time()
-                                logger.debug(f"Niveau lumière mis à jour: {light}")
-                            except:
-                                pass
-                        
-                        elif line.startswith("MODE_CHANGE:"):
-                            mode = int(line.split(":")[1])
-                            mode_names = {
-                                0: "NAVIGATION",
-                                1: "OBJECT_DETECTION", 
-                                2: "FACE_RECOGNITION",
-                                3: "TEXT_READING",
-                                4: "AI_ASSISTANT"
-                            }
-                            mode_name = mode_names.get(mode, f"INCONNU({mode})")
-                            logger.info(f"Mode Arduino changé: {mode_name}")
-                        
-                        elif line.startswith("BUTTON:"):
-                            button_id = int(line.split(":")[1])
-                            logger.info(f"Bouton {button_id} pressé")
-                        
-                        elif line.startswith("JOYSTICK:"):
-                            # Format: "JOYSTICK:xValue,yValue"
-                            pass  # Ignorer pour le moment
-                        
-                        elif line.startswith("ARDUINO_READY"):
-                            logger.info("Arduino prêt")
+                # Dormir dans le noyau jusqu'à l'arrivée d'octets ou au signal d'arrêt
+                if use_select:
+                    ready, _, _ = select.select([self.serial_conn.fileno(), self._stop_r], [], [])
+                    if self._stop_r in ready:
+                        break
+                
+                waiting = self.serial_conn.in_waiting
+                if not waiting:
+                    if not use_select:
+                        time.sleep(0.01)
+                    continue
                 
-                time.sleep(0.01)
+                # Lire directement dans le tampon préalloué, sans dépasser l'espace libre
+                if self._rxlen == RX_BUFFER_SIZE:
+                    self._rxlen = 0  # Ligne trop longue sans '\n' : l'abandonner
+                free = min(waiting, RX_BUFFER_SIZE - self._rxlen)
+                n = self.serial_conn.readinto(self._rxview[self._rxlen:self._rxlen + free])
+                if not n:
+                    continue
+                self._rxlen += n
+                self._rx_time = self._now()  # Une seule lecture d'horloge par réveil
+                self._drain_lines()
                 
             except Exception as e:
                 logger.error(f"Erreur lecture thread: {e}")
                 time.sleep(0.1)
     
+    def _drain_lines(self):
+        """Traite toutes les lignes complètes du tampon, puis décale le reste une fois."""
+        buf = self._rxbuf
+        view = self._rxview
+        size = self._rxlen
+        start = 0
+        end = buf.find(b'\n', 0, size)
+        while end != -1:
+            stop = end
+            if stop > start and buf[stop - 1] == 0x0D:  # println() termine par "\r\n"
+                stop -= 1
+            if stop > start:
+                self._handle_line(bytes(view[start:stop]))
+            start = end + 1
+            end = buf.find(b'\n', start, size)
+        
+        if start:
+            remaining = size - start
+            buf[:remaining] = buf[start:size]
+            self._rxlen = remaining
+    
+    def _handle_line(self, line):
+        """Traite une ligne (bytes) reçue par le thread de lecture."""
+        self._last_line_time = self._rx_time  # Battement de cœur passif pour is_healthy
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Message Arduino: {line.decode('ascii', errors='ignore')}")
+        
+        # Réponse à une commande en attente dans _send_query
+        if self.command_waiting:
+            self._response_queue.put(line.decode('ascii', errors='ignore').strip())
+        
+        # Traiter les messages automatiques
+        key, _, value = line.partition(b':')
+        handler = self._handlers.get(key)
+        if handler is not None:
+            handler(value)
+    
+    def _on_light_level(self, value):
+        try:
+            light = int(value)
+        except ValueError:
+            return
+        self._light_state = (light, self._rx_time)
+        logger.debug(f"Niveau lumière mis à jour: {light}")
+    
+    def _on_mode_change(self, value):
+        try:
+            mode = int(value)
+        except ValueError:
+            return
+        mode_name = self.MODE_NAMES[mode] if 0 <= mode < len(self.MODE_NAMES) else f"INCONNU({mode})"
+        logger.info(f"Mode Arduino changé: {mode_name}")
+    
+    def _on_button(self, value):
+        try:
+            button_id = int(value)
+        except ValueError:
+            return
+        logger.info(f"Bouton {button_id} pressé")
+    
+    def _on_ready(self, value):
+        logger.info("Arduino prêt")
+    
     def _start_reading_thread(self):
         """Démarre le thread de lecture passive."""
+        # select() n'accepte les descripteurs série et les pipes que sous POSIX
+        if os.name == 'posix' and self._stop_r is None:
+            self._stop_r, self._stop_w = os.pipe()
+        
         self.running = True
         self.reading_thread = threading.Thread(
             target=self._reading_loop,
@@ -183,7 +303,7 @@ class ArduinoUnoAdapter:
         # Ton Arduino retourne la distance en mètres (voir ligne: return distance / 100.0)
         # Nous devons convertir en centimètres
         
-        response = self._send_command("GET_ULTRASONIC")
+        response = self._send_query("GET_ULTRASONIC")
         
         if response and response.startswith("DISTANCE:"):
             try:
@@ -197,7 +317,7 @@ class ArduinoUnoAdapter:
                 # Valider la plage (2cm à 400cm)
                 if 2 <= distance_cm <= 400:
                     self.last_distance = distance_cm
-                    self.last_distance_time = time.time()
+                    self.last_distance_time = self._now()
                     logger.debug(f"Distance ultrasonique: {distance_cm:.1f} cm")
                     return distance_cm
                 else:
@@ -218,22 +338,32 @@ class ArduinoUnoAdapter:
     def get_light_level(self):
         """Obtient le niveau de lumière (0-1023)."""
         # Si nous avons une valeur récente (< 3 secondes), la retourner
-        if self.last_light_level and (time.time() - self.last_light_time < 3.5):
-            return self.last_light_level
+        light_level, light_time = self._light_state
+        if light_level and (self._now() - light_time < 3.5):
+            return light_level
         
         # Sinon, demander explicitement
-        response = self._send_command("GET_LIGHT")
+        response = self._send_query("GET_LIGHT")
         
         if response and response.startswith("LIGHT_LEVEL:"):
             try:
                 light = int(response.split(":")[1])
-                self.last_light_level = light
-                self.last_light_time = time.time()
+                self._light_state = (light, self._now())
                 return light
             except:
-                return self.last_light_level
+                return self._light_state[0]
         
-        return self.last_light_level
+        return self._light_state[0]
+    
+    @property
+    def last_light_level(self):
+        """Dernier niveau de lumière reçu (0-1023)."""
+        return self._light_state[0]
+    
+    @property
+    def last_light_time(self):
+        """Heure (monotone) du dernier niveau de lumière reçu."""
+        return self._light_state[1]
     
     def set_mode(self, mode):
         """
@@ -244,32 +374,35 @@ class ArduinoUnoAdapter:
                   3=TEXT_READING, 4=AI_ASSISTANT
         """
         if 0 <= mode <= 4:
-            response = self._send_command(f"MODE:{mode}")
-            return response is not None
+            return self._send_fire(self._MODE_BYTES[mode])
         else:
             logger.error(f"Mode invalide: {mode}")
             return False
     
     def activate_buzzer(self, duration_ms=200, frequency_hz=1000):
         """Active le buzzer."""
-        return self._send_command(f"BUZZER:{duration_ms}:{frequency_hz}") is not None
+        return self._send_fire(self._BUZZ_TMPL % (duration_ms, frequency_hz))
     
     def activate_vibration(self, duration_ms=200):
         """Active le vibreur."""
-        return self._send_command(f"VIBRATE:{duration_ms}") is not None
+        return self._send_fire(self._VIBRATE_TMPL % duration_ms)
     
     def quick_beep(self):
         """Émet un bip court."""
-        return self._send_command("BEEP") is not None
+        return self._send_fire(self._BEEP_BYTES)
     
     def is_healthy(self):
         """Vérifie si l'Arduino est connecté et répond."""
-        if not self.serial_conn:
+        if not self.serial_conn or not self.serial_conn.is_open:
             return False
         
-        # Vérifier la connexion en envoyant une commande simple
+        # Une ligne reçue récemment par le thread de lecture suffit : aucun échange série
+        if self._now() - self._last_line_time < self.HEALTH_TIMEOUT:
+            return True
+        
+        # Arduino silencieux : vérifier la connexion en envoyant une commande simple
         try:
-            response = self._send_command("GET_LIGHT")
+            response = self._send_query("GET_LIGHT")
             return response is not None and response.startswith("LIGHT_LEVEL:")
         except:
             return False
@@ -278,10 +411,20 @@ class ArduinoUnoAdapter:
         """Ferme la connexion proprement."""
         self.running = False
         
+        # Réveiller le thread bloqué dans select()
+        if self._stop_w is not None:
+            os.write(self._stop_w, b'x')
+        
         if self.reading_thread:
             self.reading_thread.join(timeout=1.0)
         
+        if self._stop_r is not None:
+            os.close(self._stop_r)
+            os.close(self._stop_w)
+            self._stop_r = self._stop_w = None
+        
         if self.serial_conn:
+            self._fd = None
             self.serial_conn.close()
             self.serial_conn = None
         
@@ -2,13 +2,24 @@
 Adaptateur pour la caméra Raspberry Pi.
 Support PiCamera v2/v3 et webcam USB.
 """
+import os
 import time
 import logging
+import threading
 from typing import Optional, Tuple
 import numpy as np
 
+try:
+    import cv2
+except ImportError:  # PiCamera2 seule : OpenCV n'est requis que pour la webcam USB
+    cv2 = None
+
 logger = logging.getLogger(__name__)
 
+# Tampons RGB en rotation : la frame publiée dans _latest, les deux dernières rendues
+# au consommateur (une en inférence, une acquise) et celle en cours d'écriture
+FRAME_POOL_SIZE = 5
+
 class CameraAdapter:
     """Adaptateur pour différentes caméras."""
     
@@ -24,7 +35,22 @@ class CameraAdapter:
         self.camera_type = None
         self.last_frame_time = 0
         
+        # Tampons réutilisés d'une frame à l'autre
+        self._bgr_buf = None
+        self._rgb_pool = []
+        self._pool_index = 0
+        self._taken_indices = (-1, -1)  # Tampons des deux dernières frames rendues, jamais réécrits
+        self._mapped_array = None   # picamera2.MappedArray, résolu à l'initialisation
+        self._rotation_code = None  # Code cv2.rotate, résolu une fois pour toutes
+        
+        # Capture en arrière-plan : emplacement unique "dernière frame"
+        self._capture_thread = None
+        self._capturing = False
+        self._latest = (None, -1)   # (frame, indice du tampon dans le pool)
+        self._new_frame_evt = threading.Event()
+        
         self._initialize_camera()
+        self.start_capture()
         
         logger.info(f"CameraAdapter initialisé: {self.camera_type}, "
                    f"{config['width']}x{config['height']} @ {config['fps']} FPS")
@@ -33,7 +59,7 @@ class CameraAdapter:
         """Initialise la caméra selon le matériel disponible."""
         try:
             # Essayer PiCamera d'abord (pour Raspberry Pi)
-            from picamera2 import Picamera2
+            from picamera2 import Picamera2, MappedArray
             from libcamera import controls
             
             self.camera = Picamera2()
@@ -52,6 +78,7 @@ class CameraAdapter:
             
             self.camera.configure(config)
             self.camera.start()
+            self._mapped_array = MappedArray
             self.camera_type = "picamera2"
             
             logger.info("PiCamera2 initialisé avec succès")
@@ -63,12 +90,20 @@ class CameraAdapter:
     def _initialize_opencv(self):
         """Initialise avec OpenCV (pour webcam USB)."""
         try:
-            import cv2
+            if cv2 is None:
+                raise ImportError("OpenCV (cv2) non installé")
             
-            self.camera = cv2.VideoCapture(0)
+            # V4L2 direct sous Linux (pas de couche GStreamer)
+            backend = cv2.CAP_V4L2 if os.name == 'posix' else cv2.CAP_ANY
+            self.camera = cv2.VideoCapture(0, backend)
             if not self.camera.isOpened():
                 raise RuntimeError("Impossible d'ouvrir la caméra")
             
+            # MJPG : 4x moins de bande passante USB que YUYV
+            self.camera.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+            # Un seul tampon pilote : toujours la frame la plus récente
+            self.camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            
             # Configurer la résolution et FPS
             self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, self.config['width'])
             self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, self.config['height'])
@@ -84,6 +119,13 @@ class CameraAdapter:
                 self.config['width'] = actual_width
                 self.config['height'] = actual_height
             
+            # Rotation si configuré
+            self._rotation_code = {
+                90: cv2.ROTATE_90_CLOCKWISE,
+                180: cv2.ROTATE_180,
+                270: cv2.ROTATE_90_COUNTERCLOCKWISE
+            }.get(self.config.get('rotation', 0))
+            
             self.camera_type = "opencv"
             logger.info(f"OpenCV camera initialisé: {actual_width}x{actual_height}")
             
@@ -91,9 +133,65 @@ class CameraAdapter:
             logger.error(f"Échec initialisation caméra: {e}")
             raise RuntimeError(f"Impossible d'initialiser la caméra: {e}")
     
+    def start_capture(self):
+        """Démarre le thread qui lit la caméra pendant que le consommateur travaille."""
+        if self._capture_thread is not None:
+            return
+        
+        self._capturing = True
+        self._capture_thread = threading.Thread(
+            target=self._capture_loop,
+            name="CameraCapture",
+            daemon=True
+        )
+        self._capture_thread.start()
+    
+    def _capture_loop(self):
+        """Publie chaque nouvelle frame dans l'emplacement _latest."""
+        while self._capturing:
+            frame = self._read_frame()
+            if frame is None:
+                time.sleep(0.01)
+                continue
+            
+            # Écrase la frame précédente si elle n'a pas été prise :
+            # affectation d'une référence, atomique sous le GIL
+            self._latest = (frame, self._pool_index)
+            self._new_frame_evt.set()
+    
     def capture_frame(self) -> Optional[np.ndarray]:
         """
-        Capture une frame de la caméra.
+        Retourne la dernière frame capturée, sans attendre.
+        
+        Returns:
+            Image numpy array (RGB) ou None si aucune frame n'est encore disponible.
+            Le tampon reste valide pendant l'appel suivant de capture_frame/wait_frame.
+        """
+        if self._capture_thread is None:
+            return self._read_frame()
+        
+        frame, index = self._latest
+        self._taken_indices = (self._taken_indices[1], index)
+        self._new_frame_evt.clear()
+        return frame
+    
+    def wait_frame(self, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """
+        Attend une frame plus récente que la dernière retournée.
+        
+        Returns:
+            Image numpy array (RGB) ou None si le timeout expire
+        """
+        if self._capture_thread is None:
+            return self._read_frame()
+        
+        if not self._new_frame_evt.wait(timeout):
+            return None
+        return self.capture_frame()
+    
+    def _read_frame(self) -> Optional[np.ndarray]:
+        """
+        Lit une frame directement sur la caméra (bloquant).
         
         Returns:
             Image numpy array (RGB) ou None en cas d'erreur
@@ -102,38 +200,44 @@ class CameraAdapter:
             self.last_frame_time = time.time()
             
             if self.camera_type == "picamera2":
-                # Capture avec PiCamera2
-                frame = self.camera.capture_array()
-                
-                # Convertir en RGB si nécessaire
-                if len(frame.shape) == 3 and frame.shape[2] == 3:
-                    # Déjà RGB
-                    pass
-                else:
-                    # Convertir BGR à RGB
-                    frame = frame[:, :, ::-1]
+                # Capture avec PiCamera2 : lire le tampon DMA de la requête sur place
+                # (capture_array alloue et copie une nouvelle image à chaque appel).
+                # La vue n'est valide que dans le bloc with : une seule copie vers le pool.
+                with self.camera.captured_request() as request:
+                    with self._mapped_array(request, "main") as mapped:
+                        src = mapped.array
+                        if len(src.shape) == 3 and src.shape[2] == 3:
+                            # Déjà RGB
+                            frame = self._next_rgb_buffer(src.shape[:2])
+                            np.copyto(frame, src)
+                        elif cv2 is not None:
+                            # Format 4 canaux : conversion contiguë dans le tampon réutilisé
+                            frame = cv2.cvtColor(src, cv2.COLOR_BGRA2RGB,
+                                                 dst=self._next_rgb_buffer(src.shape[:2]))
+                        else:
+                            # Sans OpenCV : canaux B, G, R inversés par NumPy dans le tampon
+                            frame = self._next_rgb_buffer(src.shape[:2])
+                            np.copyto(frame, src[:, :, 2::-1])
                 
             elif self.camera_type == "opencv":
                 # Capture avec OpenCV
-                import cv2
-                
-                ret, frame = self.camera.read()
+                # grab() puis retrieve() dans le tampon BGR réutilisé
+                if not self.camera.grab():
+                    logger.warning("Échec capture frame OpenCV")
+                    return None
+                ret, frame = self.camera.retrieve(self._bgr_buf)
                 if not ret:
                     logger.warning("Échec capture frame OpenCV")
                     return None
+                self._bgr_buf = frame
                 
-                # OpenCV utilise BGR, convertir en RGB
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                # OpenCV utilise BGR, convertir en RGB (sans allocation)
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB,
+                                     dst=self._next_rgb_buffer(frame.shape[:2]))
                 
                 # Rotation si configuré
-                if self.config.get('rotation', 0) != 0:
-                    rotation_code = {
-                        90: cv2.ROTATE_90_CLOCKWISE,
-                        180: cv2.ROTATE_180,
-                        270: cv2.ROTATE_90_COUNTERCLOCKWISE
-                    }.get(self.config['rotation'])
-                    if rotation_code:
-                        frame = cv2.rotate(frame, rotation_code)
+                if self._rotation_code is not None:
+                    frame = cv2.rotate(frame, self._rotation_code)
             else:
                 return None
             
@@ -143,6 +247,22 @@ class CameraAdapter:
             logger.error(f"Erreur capture frame: {e}")
             return None
     
+    def _next_rgb_buffer(self, size: Tuple[int, int]) -> np.ndarray:
+        """
+        Retourne le prochain tampon RGB du pool, réalloué seulement si la taille change.
+        
+        Saute le tampon publié dans _latest et les deux derniers rendus au consommateur.
+        """
+        shape = (size[0], size[1], 3)
+        if not self._rgb_pool or self._rgb_pool[0].shape != shape:
+            self._rgb_pool = [np.empty(shape, dtype=np.uint8) for _ in range(FRAME_POOL_SIZE)]
+        busy = (self._latest[1],) + self._taken_indices
+        index = (self._pool_index + 1) % FRAME_POOL_SIZE
+        while index in busy:
+            index = (index + 1) % FRAME_POOL_SIZE
+        self._pool_index = index
+        return self._rgb_pool[index]
+    
     def get_frame_rate(self) -> float:
         """Retourne le taux de capture réel."""
         return self.config['fps']
@@ -159,7 +279,6 @@ class CameraAdapter:
         """Ajuste l'exposition (0-1)."""
         if self.camera_type == "picamera2":
             try:
-                from libcamera import controls
                 # Convertir brightness à valeur d'exposition
                 exposure = int(10000 * brightness)
                 self.camera.set_controls({"ExposureTime": exposure})
@@ -168,12 +287,16 @@ class CameraAdapter:
     
     def close(self):
         """Ferme la caméra proprement."""
+        if self._capture_thread is not None:
+            self._capturing = False
+            self._capture_thread.join(timeout=1.0)
+            self._capture_thread = None
+        
         if self.camera:
             if self.camera_type == "picamera2":
                 self.camera.stop()
                 self.camera.close()
             elif self.camera_type == "opencv":
-                import cv2
                 self.camera.release()
             
             logger.info("Caméra fermée")
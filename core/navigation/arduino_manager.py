@@ -1,14 +1,32 @@
 """
 ArduinoManager - Gestion centralisée de l'Arduino Uno
 """
+import os
 import serial
 import time
+import select
+import struct
 import logging
+import binascii
 import threading
 from typing import Optional, Dict, Any, Callable
 
 logger = logging.getLogger(__name__)
 
+# Trame binaire de télémétrie : SYNC + <tag:u8><seq:u8><distance_mm:u16><light:u16><crc:u16>
+# Le CRC-CCITT (crc_hqx) couvre SYNC..light. L'octet SYNC n'est jamais de l'ASCII,
+# les trames texte "CLE:valeur\n" restent donc acceptées sur le même flux.
+BINARY_SYNC = 0xA5
+BINARY_RECORD = struct.Struct('<BBHHH')
+BINARY_FRAME_SIZE = 1 + BINARY_RECORD.size
+BINARY_CRC_SPAN = BINARY_FRAME_SIZE - 2
+
+# Anneau producteur unique (thread de lecture) / consommateur unique (navigation)
+RING_SIZE = 64  # Puissance de 2 : index = compteur & RING_MASK
+RING_MASK = RING_SIZE - 1
+
+RX_BUFFER_SIZE = 4096  # Tampon de réception alloué une seule fois
+
 class ArduinoManager:
     """
     Gère la communication avec l'Arduino Uno.
@@ -19,19 +37,36 @@ class ArduinoManager:
         self.port = port
         self.baudrate = baudrate
         self.serial_conn = None
+        self._fd = None  # Descripteur série (POSIX) pour les écritures directes
         self.running = False
         self.read_thread = None
+        self._rxbuf = bytearray(RX_BUFFER_SIZE)  # Octets reçus pas encore traités (texte ou binaire)
+        self._rxview = memoryview(self._rxbuf)
+        self._rxlen = 0                          # Octets valides en tête de _rxbuf
+        self._now = time.time
+        self._rx_time = 0          # Heure du dernier réveil du thread de lecture
         
         # Dernières données
         self.last_ultrasonic = None
         self.last_light = None
         self.last_timestamp = 0
         
+        # Mesures ultrasoniques (distance, timestamp) publiées sans verrou : seul le
+        # thread de lecture écrit, et l'affectation d'un int/tuple est atomique sous le GIL
+        self._ring = [None] * RING_SIZE
+        self._tail = 0
+        
         # Callbacks
-        self.data_callbacks = []
+        # Tuple remplacé à chaque enregistrement (copie sur écriture) : le thread
+        # de lecture itère un instantané sans verrou
+        self.data_callbacks = ()
         
-        # Verrou
-        self.lock = threading.RLock()
+        # Clé avant ':' → mise à jour de l'état (les autres clés sont seulement notifiées)
+        # Les lignes restent en bytes : float()/int() les acceptent sans décodage
+        self._handlers = {
+            b'ULTRASONIC': self._on_ultrasonic,
+            b'LIGHT': self._on_light,
+        }
         
         logger.info(f"ArduinoManager initialisé pour {port}")
     
@@ -45,6 +80,10 @@ class ArduinoManager:
                 write_timeout=2.0
             )
             
+            # pyserial ouvre déjà le port en O_NONBLOCK sous POSIX
+            if os.name == 'posix':
+                self._fd = self.serial_conn.fileno()
+            
             # Attendre l'initialisation Arduino
             time.sleep(3)
             
@@ -52,6 +91,9 @@ class ArduinoManager:
             while self.serial_conn.in_waiting:
                 self.serial_conn.readline()
             
+            # Le sketch n'émet les trames binaires qu'à la demande
+            self.send_command("TELEMETRY:BIN")
+            
             self.running = True
             self.read_thread = threading.Thread(target=self._read_loop, daemon=True)
             self.read_thread.start()
@@ -67,51 +109,121 @@ class ArduinoManager:
         """Boucle de lecture des données Arduino."""
         while self.running and self.serial_conn:
             try:
-                if self.serial_conn.in_waiting:
-                    line = self.serial_conn.readline().decode('ascii', errors='ignore').strip()
-                    if line:
-                        self._process_line(line)
+                if self._rxlen == RX_BUFFER_SIZE:
+                    self._rxlen = 0  # Tampon plein sans trame complète : repartir de zéro
+                
+                # Lire tout ce qui attend ; sinon lire 1 octet bloque dans le noyau jusqu'au timeout.
+                # readinto écrit directement dans le tampon préalloué.
+                free = min(self.serial_conn.in_waiting or 1, RX_BUFFER_SIZE - self._rxlen)
+                n = self.serial_conn.readinto(self._rxview[self._rxlen:self._rxlen + free])
+                if not n:
+                    continue
+                self._rxlen += n
+                self._rx_time = self._now()  # Une seule lecture d'horloge par réveil
+                self._drain_buffer()
             except Exception as e:
                 logger.error(f"Erreur lecture Arduino: {e}")
                 time.sleep(0.1)
     
-    def _process_line(self, line: str):
+    def _drain_buffer(self):
+        """Extrait du tampon toutes les trames complètes, binaires ou texte."""
+        buf = self._rxbuf
+        view = self._rxview
+        size = self._rxlen
+        pos = 0
+        while pos < size:
+            sync = buf.find(BINARY_SYNC, pos, size)
+            end = buf.find(b'\n', pos, size)
+            
+            if sync != -1 and (end == -1 or sync < end):
+                if size - sync < BINARY_FRAME_SIZE:
+                    pos = sync  # Attendre la fin de la trame
+                    break
+                crc_expected = binascii.crc_hqx(view[sync:sync + BINARY_CRC_SPAN], 0)
+                tag, seq, distance_mm, light, crc = BINARY_RECORD.unpack_from(buf, sync + 1)
+                if crc != crc_expected:
+                    pos = sync + 1  # Faux SYNC : se resynchroniser sur l'octet suivant
+                    continue
+                pos = sync + BINARY_FRAME_SIZE
+                self._process_record(distance_mm, light)
+            
+            elif end != -1:
+                stop = end
+                if stop > pos and buf[stop - 1] == 0x0D:  # println() termine par "\r\n"
+                    stop -= 1
+                if stop > pos:
+                    self._process_line(bytes(view[pos:stop]))
+                pos = end + 1
+            
+            else:
+                break
+        
+        # Un seul décalage des octets restants par réveil
+        if pos:
+            remaining = size - pos
+            buf[:remaining] = buf[pos:size]
+            self._rxlen = remaining
+    
+    def _process_record(self, distance_mm: int, light: int):
+        """Traite une trame binaire de télémétrie."""
+        distance = distance_mm * 0.1  # mm → cm
+        if 2.0 <= distance <= 400.0:
+            self._publish_ultrasonic(distance)
+        self.last_light = light
+        
+        # Mêmes notifications qu'avec le protocole texte
+        if self.data_callbacks:
+            self._notify_callbacks('ULTRASONIC', str(distance))
+            self._notify_callbacks('LIGHT', str(light))
+    
+    def _process_line(self, line: bytes):
         """Traite une ligne reçue de l'Arduino."""
         try:
-            if ':' not in line:
+            key, sep, value = line.partition(b':')
+            if not sep:
                 return
             
-            key, value = line.split(':', 1)
-            key = key.strip()
-            value = value.strip()
-            
-            timestamp = time.time()
+            # float()/int() ignorent les espaces autour de la valeur : pas de strip()
+            handler = self._handlers.get(key)
+            if handler is not None:
+                handler(value)
             
-            with self.lock:
-                if key == "ULTRASONIC":
-                    try:
-                        distance = float(value)
-                        if 2.0 <= distance <= 400.0:
-                            self.last_ultrasonic = distance
-                            self.last_timestamp = timestamp
-                    except ValueError:
-                        pass
-                
-                elif key == "LIGHT":
-                    try:
-                        self.last_light = int(value)
-                    except ValueError:
-                        pass
-                
-                # Notifier les callbacks
-                self._notify_callbacks(key, value)
+            # Notifier les callbacks (décodage et nettoyage seulement s'il y en a)
+            if self.data_callbacks:
+                self._notify_callbacks(key.strip().decode('ascii', errors='ignore'),
+                                       value.strip().decode('ascii', errors='ignore'))
                 
         except Exception as e:
             logger.error(f"Erreur traitement ligne: {e}")
     
+    def _on_ultrasonic(self, value: bytes):
+        try:
+            distance = float(value)
+        except ValueError:
+            return
+        if 2.0 <= distance <= 400.0:
+            self._publish_ultrasonic(distance)
+    
+    def _publish_ultrasonic(self, distance: float):
+        """Écrit une mesure dans l'anneau puis publie le nouveau compteur."""
+        timestamp = self._rx_time
+        self._ring[self._tail & RING_MASK] = (distance, timestamp)
+        self._tail += 1
+        self.last_ultrasonic = distance
+        self.last_timestamp = timestamp
+    
+    def _on_light(self, value: bytes):
+        try:
+            self.last_light = int(value)
+        except ValueError:
+            pass
+    
     def _notify_callbacks(self, key: str, value: str):
         """Notifie les callbacks enregistrés."""
-        for callback in self.data_callbacks:
+        callbacks = self.data_callbacks
+        if not callbacks:
+            return
+        for callback in callbacks:
             try:
                 callback(key, value)
             except Exception:
@@ -119,18 +231,20 @@ class ArduinoManager:
     
     def register_callback(self, callback: Callable[[str, str], None]):
         """Enregistre un callback pour les données."""
-        self.data_callbacks.append(callback)
+        self.data_callbacks = self.data_callbacks + (callback,)
     
     def get_latest_ultrasonic(self) -> Optional[Dict[str, Any]]:
         """Récupère la dernière mesure ultrasonique."""
-        with self.lock:
-            if self.last_ultrasonic is not None:
-                return {
-                    'distance': self.last_ultrasonic,
-                    'angle': 0.0,
-                    'timestamp': self.last_timestamp
-                }
-        return None
+        tail = self._tail
+        if tail == 0:
+            return None
+        
+        distance, timestamp = self._ring[(tail - 1) & RING_MASK]
+        return {
+            'distance': distance,
+            'angle': 0.0,
+            'timestamp': timestamp
+        }
     
     def send_command(self, command: str) -> bool:
         """Envoie une commande à l'Arduino."""
@@ -138,9 +252,20 @@ class ArduinoManager:
             return False
         
         try:
-            full_cmd = f"{command}\n"
-            self.serial_conn.write(full_cmd.encode('ascii'))
-            self.serial_conn.flush()
+            data = f"{command}\n".encode('ascii')
+            if self._fd is None:
+                self.serial_conn.write(data)
+                return True
+            
+            # Quelques octets tiennent dans le tampon tty : os.write rend la main
+            # aussitôt, sans la boucle select() de Serial.write ni le tcdrain de flush()
+            try:
+                written = os.write(self._fd, data)
+            except BlockingIOError:
+                select.select([], [self._fd], [], 0.001)  # Tampon plein : une seule nouvelle tentative
+                written = os.write(self._fd, data)
+            if written < len(data):
+                self.serial_conn.write(data[written:])
             return True
         except Exception:
             return False
@@ -157,6 +282,8 @@ class ArduinoManager:
             self.read_thread.join(timeout=1.0)
         
         if self.serial_conn:
+            self.send_command("TELEMETRY:TEXT")  # Rendre le flux texte aux autres lecteurs
+            self._fd = None
             self.serial_conn.close()
         
         logger.info("ArduinoManager arrêté")
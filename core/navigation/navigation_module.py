@@ -1,15 +1,80 @@
 """
 NavigationModule - Version minimale fonctionnelle
 """
+import copy
+import json
+import os
 import threading
+from array import array
 import queue
+import re
 import time
-import yaml
 from enum import Enum
+from types import MappingProxyType
+from functools import lru_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Anneau des dernières mesures ultrason (taille puissance de 2 : index par masque)
+_US_RING_SIZE = 256
+_US_RING_MASK = _US_RING_SIZE - 1
+
+# Convertisseur et format attendu par type de donnée Arduino : une trame bruitée
+# est rejetée par la regex, sans lever d'exception
+_ARDUINO_PARSERS = {
+    'ULTRASONIC': (float, re.compile(r'-?\d+(?:\.\d+)?')),
+    'LIGHT': (int, re.compile(r'-?\d+')),
+}
+
+def _read_config(config_path):
+    """
+    Lit la configuration YAML (FileNotFoundError propagée si le fichier est absent).
+    
+    Le dict parsé est partagé par toutes les instances du processus tant que le
+    fichier n'a pas changé ; chaque appelant reçoit sa propre copie, qu'il peut modifier.
+    """
+    stat = os.stat(config_path)
+    return copy.deepcopy(_load_config(os.path.abspath(config_path),
+                                      stat.st_mtime_ns, stat.st_size))
+
+@lru_cache(maxsize=8)
+def _load_config(config_path, mtime_ns, size):
+    """
+    Parse le YAML, via un cache JSON voisin tant que le YAML n'a pas changé.
+    
+    Le cache est indexé sur (mtime_ns, taille) du YAML : une réécriture dans la même
+    seconde l'invalide aussi. Le résultat est partagé : ne pas le modifier.
+    """
+    version = [mtime_ns, size]
+    cache_path = config_path + '.cache.json'
+    
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('version') == version:
+            return cached['config']
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    
+    # PyYAML importé seulement si le cache JSON est absent ou périmé ;
+    # libyaml (C) si PyYAML a été compilé avec, sinon le chargeur pur Python
+    import yaml
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = yaml.load(f, Loader=loader)
+    
+    # Écriture atomique : un lecteur concurrent ne voit jamais un cache tronqué
+    try:
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': version, 'config': config}, f)
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError) as e:
+        logger.debug(f"Cache de configuration non écrit: {e}")
+    
+    return config
+
 class NavigationState(Enum):
     IDLE = "idle"
     SCANNING = "scanning"
@@ -23,6 +88,8 @@ class NavigationModule:
         
         # États
         self.state = NavigationState.IDLE
+        # Notifiée à chaque changement d'état (observateurs sans sondage)
+        self._state_cv = threading.Condition()
         self.running = False
         
         # Composants
@@ -35,8 +102,15 @@ class NavigationModule:
         self.frame_queue = queue.Queue(maxsize=3)
         self.fusion_queue = queue.Queue(maxsize=5)
         
-        # Variables Arduino
-        self.last_ultrasound_data = None
+        # Réveil des threads sur événement (plus de sondage périodique)
+        self._frame_event = threading.Event()
+        self._fusion_event = threading.Event()
+        
+        # Variables Arduino : mesures ultrason en tableaux préalloués (structure de tableaux ;
+        # array plutôt que NumPy, pour que l'import du module reste léger)
+        self._us_dist = array('f', bytes(4 * _US_RING_SIZE))
+        self._us_ts = array('d', bytes(8 * _US_RING_SIZE))
+        self._us_head = 0  # Nombre total de mesures reçues
         self.last_ultrasound_time = 0
         self.current_light_level = 512
         
@@ -48,6 +122,8 @@ class NavigationModule:
             'warnings_issued': 0,
             'arduino_readings': 0
         }
+        # Les compteurs sont incrémentés depuis les threads Arduino et caméra
+        self._stats_lock = threading.Lock()
         
         # Télémetrie
         self.telemetry = {
@@ -58,12 +134,21 @@ class NavigationModule:
             }
         }
         
+        # Vue d'état construite une fois, tenue à jour sous _stats_lock par les
+        # écrivains : get_state la renvoie en lecture seule, sans copie
+        self._state_view = {
+            'module_state': self.state.value,
+            'running': self.running,
+            'arduino_status': MappingProxyType(self.telemetry['arduino']),
+            'statistics': MappingProxyType(self.stats)
+        }
+        self._state_proxy = MappingProxyType(self._state_view)
+        
         logger.info("NavigationModule (minimal) initialisé")
     
     def load_config(self, config_path):
         try:
-            with open(config_path, 'r') as f:
-                self.config = yaml.safe_load(f)
+            self.config = _read_config(config_path)
             logger.info(f"Configuration chargée depuis {config_path}")
         except FileNotFoundError:
             logger.warning("Configuration non trouvée, valeurs par défaut")
@@ -77,7 +162,9 @@ class NavigationModule:
             return
         
         self.running = True
-        self.stats['start_time'] = time.time()
+        with self._stats_lock:
+            self.stats['start_time'] = time.time()
+            self._state_view['running'] = True
         
         try:
             # Initialiser ArduinoManager
@@ -89,7 +176,8 @@ class NavigationModule:
             self.arduino_manager.register_callback(self._on_arduino_data)
             
             if self.arduino_manager.start():
-                self.telemetry['arduino']['connection_status'] = 'connected'
+                with self._stats_lock:
+                    self.telemetry['arduino']['connection_status'] = 'connected'
                 logger.info("✅ ArduinoManager démarré")
             else:
                 logger.warning("ArduinoManager n'a pas pu démarrer")
@@ -102,7 +190,7 @@ class NavigationModule:
             for thread in self.threads:
                 thread.start()
             
-            self.state = NavigationState.SCANNING
+            self._set_state(NavigationState.SCANNING)
             logger.info("✅ NavigationModule démarré")
             
         except Exception as e:
@@ -110,32 +198,75 @@ class NavigationModule:
             self.stop()
             raise
     
+    def _set_state(self, new_state):
+        with self._state_cv:
+            self.state = new_state
+            with self._stats_lock:
+                self._state_view['module_state'] = new_state.value
+            self._state_cv.notify_all()
+    
     def _on_arduino_data(self, data_type, value):
-        self.stats['arduino_readings'] += 1
+        with self._stats_lock:
+            self.stats['arduino_readings'] += 1
+        
+        parser = _ARDUINO_PARSERS.get(data_type)
+        if parser is None:
+            return
+        convert, pattern = parser
+        value = value.strip()
+        if pattern.fullmatch(value) is None:
+            return
         
         if data_type == 'ULTRASONIC':
-            try:
-                distance = float(value)
-                self.last_ultrasound_data = {
-                    'distance': distance,
-                    'angle': 0.0,
-                    'timestamp': time.time()
-                }
-                self.last_ultrasound_time = time.time()
+            distance = convert(value)
+            now = time.time()
+            i = self._us_head & _US_RING_MASK
+            self._us_dist[i] = distance
+            self._us_ts[i] = now
+            self._us_head += 1
+            self.last_ultrasound_time = now
+            with self._stats_lock:
                 self.telemetry['arduino']['last_ultrasonic'] = distance
-            except ValueError:
-                pass
-        elif data_type == 'LIGHT':
-            try:
-                self.current_light_level = int(value)
+            self._fusion_event.set()
+        else:
+            self.current_light_level = convert(value)
+            with self._stats_lock:
                 self.telemetry['arduino']['last_light'] = self.current_light_level
-            except ValueError:
-                pass
+    
+    @property
+    def last_ultrasound_data(self):
+        """Dernière mesure ultrason sous forme de dict (None avant la première mesure)."""
+        head = self._us_head
+        if head == 0:
+            return None
+        i = (head - 1) & _US_RING_MASK
+        return {
+            'distance': self._us_dist[i],
+            'angle': 0.0,
+            'timestamp': self._us_ts[i]
+        }
+    
+    def get_recent_distances(self, n):
+        """
+        Les n dernières distances ultrason, de la plus ancienne à la plus récente.
+        
+        memoryview float32 sur l'anneau (sans copie, np.frombuffer l'accepte) sauf si
+        la fenêtre en chevauche la fin ; ne pas la conserver, elle est réécrite par
+        les mesures suivantes.
+        """
+        head = self._us_head
+        n = max(0, min(n, head, _US_RING_SIZE))
+        start = (head - n) & _US_RING_MASK
+        if start + n <= _US_RING_SIZE:
+            return memoryview(self._us_dist)[start:start + n]
+        return memoryview(self._us_dist[start:] + self._us_dist[:(head & _US_RING_MASK)])
     
     def _camera_loop(self):
         while self.running:
             try:
-                time.sleep(0.1)  # Simuler la capture
+                # Attente passive au lieu d'un sondage périodique (timeout pour revérifier running)
+                self._frame_event.wait(timeout=1.0)
+                self._frame_event.clear()
             except Exception as e:
                 logger.error(f"Erreur camera_loop: {e}")
                 time.sleep(0.1)
@@ -143,7 +274,9 @@ class NavigationModule:
     def _fusion_loop(self):
         while self.running:
             try:
-                time.sleep(0.1)  # Simuler la fusion
+                # Réveil sur nouvelle mesure ultrason (timeout pour revérifier running)
+                self._fusion_event.wait(timeout=1.0)
+                self._fusion_event.clear()
             except Exception as e:
                 logger.error(f"Erreur fusion_loop: {e}")
                 time.sleep(0.1)
@@ -171,12 +304,8 @@ class NavigationModule:
             return {'status': 'error', 'message': str(e)}
     
     def get_state(self):
-        return {
-            'module_state': self.state.value,
-            'running': self.running,
-            'arduino_status': self.telemetry['arduino'],
-            'statistics': self.stats
-        }
+        """Vue en lecture seule de l'état courant (MappingProxyType, sans copie)."""
+        return self._state_proxy
     
     def get_sensor_data(self):
         return {
@@ -195,11 +324,17 @@ class NavigationModule:
         
         logger.info("Arrêt du NavigationModule...")
         self.running = False
+        with self._stats_lock:
+            self._state_view['running'] = False
+        
+        # Débloquer les threads en attente
+        self._frame_event.set()
+        self._fusion_event.set()
         
         if self.arduino_manager:
             self.arduino_manager.stop()
         
-        self.state = NavigationState.IDLE
+        self._set_state(NavigationState.IDLE)
         
         total_time = time.time() - self.stats['start_time']
         logger.info(f"Statistiques: {self.stats}")
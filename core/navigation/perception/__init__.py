@@ -1,15 +1,3 @@
-<<<<<<< HEAD
-"""
-Package perception - Détection d'objets et OCR
-"""
-
-# N'IMPORTE PAS NavigationModule ici !
-# Seulement les wrappers de perception
-
-from .yolo_wrapper import ObjectDetector
-from .ocr_wrapper import OCRWrapper
-
-=======
 """
 Package perception - Détection d'objets et OCR
 """
@@ -20,5 +8,4 @@ Package perception - Détection d'objets et OCR
 from .yolo_wrapper import ObjectDetector
 from .ocr_wrapper import OCRWrapper
 
->>>>>>> 8b3abaa (Major update: Complete smart glasses system)
 __all__ = ['ObjectDetector', 'OCRWrapper']
\ No newline at end of file
@@ -1,20 +1,39 @@
 """
 Wrapper pour YOLOv8 (Ultralytics) pour la détection d'objets.
 """
+import sys
 import time
 import logging
+import weakref
+from collections import deque
 from typing import List, Optional, Tuple
 import numpy as np
 
+from core._model_registry import load_prefer_onnx
+
 logger = logging.getLogger(__name__)
 
+# OpenCV importé à la première détection, pas à l'import du module
+_cv2 = None
+
+def _get_cv2():
+    global _cv2
+    if _cv2 is None:
+        import cv2
+        _cv2 = cv2
+    return _cv2
+
+# Modèles déjà préchauffés : un modèle partagé (get_yolo) ne l'est qu'une fois
+_WARMED_MODELS = weakref.WeakSet()
+
 class ObjectDetector:
     """Détecteur d'objets utilisant YOLOv8."""
     
     def __init__(self, model_path: str = 'yolov8n.pt', 
                  confidence_threshold: float = 0.5,
                  iou_threshold: float = 0.3,
-                 classes: Optional[List[int]] = None):
+                 classes: Optional[List[int]] = None,
+                 input_size: int = 640):
         """
         Initialise le détecteur YOLOv8.
         
@@ -23,39 +42,45 @@ class ObjectDetector:
             confidence_threshold: Seuil de confiance
             iou_threshold: Seuil IoU pour NMS
             classes: Liste des classes à détecter (None = toutes)
+            input_size: Taille d'entrée du réseau (côté long de l'image réduite)
         """
         self.model_path = model_path
         self.confidence_threshold = confidence_threshold
         self.iou_threshold = iou_threshold
         self.classes = classes
+        self.input_size = input_size
+        self._input_buf = None  # Image réduite, réutilisée d'une frame à l'autre
         
         self.model = None
         self.class_names = []
         self.initialized = False
         
         # Statistiques
-        self.inference_times = []
-        self.detection_counts = []
+        self.inference_times = deque(maxlen=50)
+        self.detection_counts = deque(maxlen=100)
         
         self._initialize_model()
     
     def _initialize_model(self):
         """Charge le modèle YOLOv8."""
         try:
-            from ultralytics import YOLO
-            
             logger.info(f"Chargement du modèle YOLO: {self.model_path}")
             
-            # Charger le modèle
-            self.model = YOLO(self.model_path)
+            # Export ONNX int8 (ONNX Runtime sur CPU) s'il a été généré, sinon le modèle
+            # PyTorch ; réutilise le modèle déjà chargé par un autre détecteur
+            self.model = load_prefer_onnx(self.model_path)
             
-            # Tester une inference pour vérifier
-            dummy_input = np.zeros((640, 640, 3), dtype=np.uint8)
-            results = self.model(dummy_input, verbose=False)
+            if self.model not in _WARMED_MODELS:
+                # Tester une inference pour vérifier (et préchauffer le modèle)
+                dummy_input = np.zeros((640, 640, 3), dtype=np.uint8)
+                names = getattr(self.model(dummy_input, verbose=False)[0], 'names', None)
+                _WARMED_MODELS.add(self.model)
+            else:
+                names = getattr(self.model, 'names', None)
             
             # Récupérer les noms de classes
-            if hasattr(results[0], 'names') and results[0].names:
-                self.class_names = results[0].names
+            if names:
+                self.class_names = names
             else:
                 # Noms par défaut COCO
                 self.class_names = [
@@ -106,7 +131,11 @@ class ObjectDetector:
             return []
         
         try:
-            start_time = time.time()
+            start_ns = time.monotonic_ns()
+            
+            # Réduire la frame à la taille d'entrée du réseau : les boîtes xywhn
+            # sont normalisées, donc identiques pour l'appelant
+            image = self._resize_input(image)
             
             # Exécuter l'inférence
             results = self.model(
@@ -114,17 +143,15 @@ class ObjectDetector:
                 conf=self.confidence_threshold,
                 iou=self.iou_threshold,
                 classes=self.classes,
+                imgsz=self.input_size,
                 verbose=False,
                 device='cpu'  # Forcer CPU pour Raspberry Pi
             )
             
-            inference_time = time.time() - start_time
+            # Durée mesurée sur l'horloge monotone (entiers, insensible aux réglages NTP)
+            inference_time = (time.monotonic_ns() - start_ns) * 1e-9
             self.inference_times.append(inference_time)
             
-            # Garder seulement les 50 dernières mesures
-            if len(self.inference_times) > 50:
-                self.inference_times.pop(0)
-            
             detections = []
             
             if results and len(results) > 0:
@@ -134,48 +161,44 @@ class ObjectDetector:
                     boxes = result.boxes
                     
                     # Récupérer les données des boîtes
-                    if boxes.xywhn.numel() > 0:  # xywhn: normalisé
-                        boxes_data = boxes.xywhn.cpu().numpy()
-                        confidences = boxes.conf.cpu().numpy()
-                        class_ids = boxes.cls.cpu().numpy().astype(int)
+                    if len(boxes) > 0:
+                        # Une seule vue (N, 6) [x1, y1, x2, y2, conf, cls] en pixels ; les
+                        # tenseurs sont déjà en mémoire CPU (device='cpu'), pas de .cpu()
+                        boxes_data = boxes.data.numpy()
+                        confidences = boxes_data[:, 4]
+                        class_ids = boxes_data[:, 5].astype(np.int32)
                         
-                        for i in range(len(boxes_data)):
-                            # Extraire les données
-                            x_center, y_center, width, height = boxes_data[i]
-                            confidence = float(confidences[i])
-                            class_id = int(class_ids[i])
-                            
-                            # Convertir de xywh (normalisé) à xyxy (normalisé)
-                            x1 = x_center - width / 2
-                            y1 = y_center - height / 2
-                            x2 = x_center + width / 2
-                            y2 = y_center + height / 2
-                            
-                            # S'assurer que les coordonnées sont dans [0, 1]
-                            x1 = max(0.0, min(1.0, x1))
-                            y1 = max(0.0, min(1.0, y1))
-                            x2 = max(0.0, min(1.0, x2))
-                            y2 = max(0.0, min(1.0, y2))
-                            
-                            # Obtenir le nom de la classe
-                            class_name = self.class_names[class_id] if class_id < len(self.class_names) else f"class_{class_id}"
-                            
-                            # Créer l'objet Detection
-                            detection = Detection(
-                                class_name=class_name,
+                        # Normaliser xyxy par la taille de l'image d'entrée
+                        height, width = boxes.orig_shape[:2]
+                        xyxy = boxes_data[:, :4] / np.array([width, height, width, height],
+                                                            dtype=boxes_data.dtype)
+                        
+                        # S'assurer que les coordonnées sont dans [0, 1]
+                        np.clip(xyxy, 0.0, 1.0, out=xyxy)
+                        
+                        # Repasser en (x, y, w, h) normalisé
+                        xyxy[:, 2:] -= xyxy[:, :2]
+                        
+                        names = self.class_names
+                        n_names = len(names)
+                        timestamp = time.monotonic()
+                        
+                        # Créer les objets Detection
+                        detections = [
+                            Detection(
+                                class_name=names[class_id] if class_id < n_names else f"class_{class_id}",
                                 confidence=confidence,
-                                bbox=(x1, y1, x2 - x1, y2 - y1),  # (x, y, w, h) normalisé
+                                bbox=tuple(bbox),
                                 distance_estimate=None,
                                 bearing=None,
-                                timestamp=time.time()
+                                timestamp=timestamp
                             )
-                            
-                            detections.append(detection)
+                            for bbox, confidence, class_id in zip(
+                                xyxy.tolist(), confidences.tolist(), class_ids.tolist())
+                        ]
             
             # Mettre à jour les statistiques
             self.detection_counts.append(len(detections))
-            if len(self.detection_counts) > 100:
-                self.detection_counts.pop(0)
             
             logger.debug(f"Détection: {len(detections)} objets en {inference_time:.3f}s")
             
@@ -185,6 +208,21 @@ class ObjectDetector:
             logger.error(f"Erreur détection YOLO: {e}", exc_info=True)
             return []
     
+    def _resize_input(self, image: np.ndarray) -> np.ndarray:
+        """Réduit l'image pour que son côté long vaille input_size (rapport conservé)."""
+        height, width = image.shape[:2]
+        scale = self.input_size / max(height, width)
+        if scale >= 1.0:
+            return image
+        
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        shape = (size[1], size[0]) + image.shape[2:]
+        if self._input_buf is None or self._input_buf.shape != shape or self._input_buf.dtype != image.dtype:
+            self._input_buf = np.empty(shape, dtype=image.dtype)
+        
+        cv2 = _get_cv2()
+        return cv2.resize(image, size, dst=self._input_buf, interpolation=cv2.INTER_LINEAR)
+    
     def get_average_inference_time(self) -> float:
         """Retourne le temps d'inférence moyen."""
         if not self.inference_times:
@@ -219,9 +257,10 @@ class ObjectDetector:
         """Destructeur."""
         # Libérer la mémoire GPU si nécessaire
         if hasattr(self, 'model') and self.model is not None:
+            # Ne pas importer torch pendant la destruction s'il n'a jamais été chargé
+            torch = sys.modules.get('torch')
             try:
-                import torch
-                if torch.cuda.is_available():
+                if torch is not None and torch.cuda.is_available():
                     torch.cuda.empty_cache()
             except:
                 pass
\ No newline at end of file
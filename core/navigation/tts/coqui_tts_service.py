@@ -2,16 +2,63 @@
 Service TTS (Text-to-Speech) utilisant Coqui TTS.
 Gère la synthèse vocale asynchrone avec file d'attente prioritaire.
 """
-import os
+import hashlib
+import heapq
 import time
+import itertools
 import threading
 import queue
 import logging
+import wave
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from typing import Dict, Optional
 from pathlib import Path
+import numpy as np
+
+from .._compat import DATACLASS_SLOTS
+
+try:
+    import alsaaudio  # Lecture ALSA dans le processus (pyalsaaudio)
+except ImportError:
+    alsaaudio = None
 
 logger = logging.getLogger(__name__)
 
+_job_counter = itertools.count()
+
+# Nombre maximal de phrases dont le fichier audio est mémorisé
+AUDIO_CACHE_SIZE = 512
+
+# Nombre maximal de messages de même priorité regroupés en une seule synthèse
+MAX_TTS_BATCH = 8
+
+# Lecture ALSA : trames écrites par bloc, format selon la largeur d'échantillon du WAV
+PCM_PERIOD_FRAMES = 1024
+
+# Phrases jouées directement sur ALSA : seules les courtes (alertes, souvent répétées)
+# sont écrites dans le cache disque
+CACHE_MAX_TEXT_LEN = 80
+_PCM_FORMATS = {1: 'PCM_FORMAT_U8', 2: 'PCM_FORMAT_S16_LE', 3: 'PCM_FORMAT_S24_3LE', 4: 'PCM_FORMAT_S32_LE'}
+
+def _key(text: str) -> str:
+    """Clé de cache d'une phrase (BLAKE2b 64 bits : 16 caractères hexadécimaux)."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+@dataclass(order=True, **DATACLASS_SLOTS)
+class TTSJob:
+    """
+    Message de la file TTS.
+    
+    Trié par priorité (0 = urgence) puis par ordre d'arrivée : deux messages de même
+    priorité ne comparent jamais leur contenu et sortent dans l'ordre d'insertion.
+    """
+    priority: int
+    seq: int = field(default_factory=lambda: next(_job_counter))
+    text: str = field(default="", compare=False)
+    timestamp: float = field(default=0.0, compare=False)
+    forced: bool = field(default=False, compare=False)
+
 class TTSWorker:
     """Worker TTS asynchrone avec file d'attente prioritaire."""
     
@@ -32,10 +79,18 @@ class TTSWorker:
         self.tts_model = None
         self.tts = None
         
-        # Cache pour les phrases fréquentes
-        self.audio_cache = {}
+        # Cache des phrases synthétisées : clé BLAKE2b → chemin du fichier (LRU borné).
+        # L'existence du fichier est vérifiée à l'insertion, plus à chaque message
         self.cache_dir = Path(config.get('cache_dir', 'tts_cache'))
         self.cache_dir.mkdir(exist_ok=True)
+        self._audio_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._scan_cache_dir()
+        
+        # Sortie ALSA ouverte une fois et gardée ouverte (paramètres du dernier WAV joué)
+        self._pcm = None
+        self._pcm_params = None
+        self._pcm_lock = threading.Lock()
         
         # Statistiques
         self.stats = {
@@ -45,9 +100,6 @@ class TTSWorker:
             'last_synthesis_time': 0.0
         }
         
-        # Phrases pré-chargées
-        self.preloaded_phrases = {}
-        
         self._initialize_tts()
         
         logger.info("TTSWorker initialisé")
@@ -86,6 +138,60 @@ class TTSWorker:
             logger.error(f"Erreur initialisation TTS: {e}")
             self.tts = None
     
+    def _scan_cache_dir(self):
+        """Remplit le cache mémoire avec les fichiers déjà présents (les plus récents)."""
+        try:
+            files = [p for p in self.cache_dir.glob("*.wav") if len(p.stem) == 16]
+            files.sort(key=lambda p: p.stat().st_mtime)
+        except OSError as e:
+            logger.debug(f"Lecture du cache TTS impossible: {e}")
+            return
+        
+        for path in files[-AUDIO_CACHE_SIZE:]:
+            self._audio_cache[path.stem] = str(path)
+    
+    def _cache_lookup(self, text_hash: str) -> Optional[str]:
+        """Chemin du fichier audio en cache (None si absent), marqué comme récent."""
+        with self._cache_lock:
+            path = self._audio_cache.get(text_hash)
+            if path is not None:
+                self._audio_cache.move_to_end(text_hash)
+            return path
+    
+    def _cache_insert(self, text_hash: str, path: str):
+        """Mémorise un fichier audio existant, en oubliant le plus ancien si le cache est plein."""
+        with self._cache_lock:
+            self._audio_cache[text_hash] = path
+            self._audio_cache.move_to_end(text_hash)
+            if len(self._audio_cache) > AUDIO_CACHE_SIZE:
+                self._audio_cache.popitem(last=False)
+    
+    def _lookup_audio(self, text: str, text_hash: str) -> Optional[str]:
+        """Fichier audio déjà synthétisé pour cette phrase, ou None."""
+        # Une seule recherche en mémoire, sans appel système
+        cached = self._cache_lookup(text_hash)
+        if cached is not None:
+            return cached
+        
+        # Fichier sorti du cache mémoire (ou de l'ancien nommage) mais encore sur disque
+        cache_file = self._cache_path(text, text_hash)
+        if cache_file.exists():
+            self._cache_insert(text_hash, str(cache_file))
+            return str(cache_file)
+        return None
+    
+    def _cache_path(self, text: str, text_hash: str) -> Path:
+        """Fichier de cache d'une phrase ; reprend le fichier de l'ancien nommage MD5 s'il existe."""
+        cache_file = self.cache_dir / f"{text_hash}.wav"
+        if not cache_file.exists():
+            legacy_file = self.cache_dir / f"{hashlib.md5(text.encode()).hexdigest()}.wav"
+            if legacy_file.exists():
+                try:
+                    legacy_file.replace(cache_file)
+                except OSError as e:
+                    logger.debug(f"Migration cache TTS impossible ({legacy_file.name}): {e}")
+        return cache_file
+    
     def preload_phrase(self, text: str):
         """Pré-charge une phrase dans le cache."""
         if self.tts is None or not text:
@@ -93,13 +199,15 @@ class TTSWorker:
         
         try:
             # Créer un hash pour la phrase
-            import hashlib
-            text_hash = hashlib.md5(text.encode()).hexdigest()
-            cache_file = self.cache_dir / f"{text_hash}.wav"
+            text_hash = _key(text)
             
             # Si déjà en cache, ne rien faire
+            if self._cache_lookup(text_hash) is not None:
+                return
+            
+            cache_file = self._cache_path(text, text_hash)
             if cache_file.exists():
-                self.preloaded_phrases[text_hash] = str(cache_file)
+                self._cache_insert(text_hash, str(cache_file))
                 return
             
             # Synthétiser et sauvegarder
@@ -109,7 +217,7 @@ class TTSWorker:
             )
             
             if cache_file.exists():
-                self.preloaded_phrases[text_hash] = str(cache_file)
+                self._cache_insert(text_hash, str(cache_file))
                 logger.debug(f"Phrase pré-chargée: '{text[:30]}...'")
             
         except Exception as e:
@@ -134,23 +242,16 @@ class TTSWorker:
         
         try:
             # Créer un hash pour la phrase
-            import hashlib
-            text_hash = hashlib.md5(text.encode()).hexdigest()
-            cache_file = self.cache_dir / f"{text_hash}.wav"
+            text_hash = _key(text)
             
             # Vérifier le cache
-            if cache_file.exists():
+            cached = self._lookup_audio(text, text_hash)
+            if cached is not None:
                 self.stats['cache_hits'] += 1
                 self.stats['last_synthesis_time'] = time.time() - start_time
-                return str(cache_file)
+                return cached
             
-            # Vérifier les phrases pré-chargées
-            if text_hash in self.preloaded_phrases:
-                cache_file = Path(self.preloaded_phrases[text_hash])
-                if cache_file.exists():
-                    self.stats['cache_hits'] += 1
-                    self.stats['last_synthesis_time'] = time.time() - start_time
-                    return str(cache_file)
+            cache_file = self.cache_dir / f"{text_hash}.wav"
             
             # Synthétiser la phrase
             logger.debug(f"Synthèse TTS: '{text[:50]}...' (priorité: {priority})")
@@ -162,6 +263,7 @@ class TTSWorker:
             )
             
             if cache_file.exists():
+                self._cache_insert(text_hash, str(cache_file))
                 synthesis_time = time.time() - start_time
                 self.stats['synthesis_time_total'] += synthesis_time
                 self.stats['last_synthesis_time'] = synthesis_time
@@ -176,21 +278,123 @@ class TTSWorker:
             logger.error(f"Erreur synthèse TTS: {e}")
             return None
     
-    def play_audio(self, audio_file: str):
+    def speak_direct(self, text: str, priority: int = 2) -> bool:
         """
-        Joue un fichier audio.
+        Synthétise et joue une phrase sans aller-retour par un fichier WAV.
         
-        Args:
-            audio_file: Chemin vers le fichier audio
+        Les échantillons produits par Coqui sont écrits directement dans la sortie ALSA ;
+        le fichier n'est écrit qu'ensuite, pour les phrases courtes et seulement si les
+        fichiers audio sont conservés. Une phrase déjà en cache est jouée depuis son fichier.
+        
+        Returns:
+            True si la phrase a été jouée
         """
-        if not os.path.exists(audio_file):
-            logger.error(f"Fichier audio non trouvé: {audio_file}")
-            return
+        if self.tts is None or not text:
+            logger.warning(f"TTS non disponible ou texte vide: '{text}'")
+            return False
+        
+        start_time = time.time()
         
         try:
-            # Utiliser aplay pour Raspberry Pi (ALSA)
-            import subprocess
+            text_hash = _key(text)
+            cached = self._lookup_audio(text, text_hash)
+            if cached is not None:
+                self.stats['cache_hits'] += 1
+                self.stats['last_synthesis_time'] = time.time() - start_time
+                self.play_audio(cached)
+                return True
+            
+            logger.debug(f"Synthèse TTS directe: '{text[:50]}...' (priorité: {priority})")
+            
+            wav = self.tts.tts(text=text, speaker_wav=self.config.get('speaker_wav'))
+            samples = np.asarray(wav, dtype=np.float32)
+            np.clip(samples, -1.0, 1.0, out=samples)
+            pcm = (samples * 32767).astype('<i2').tobytes()
+            rate = self.tts.synthesizer.output_sample_rate
+            
+            synthesis_time = time.time() - start_time
+            self.stats['synthesis_time_total'] += synthesis_time
+            self.stats['last_synthesis_time'] = synthesis_time
             
+            self._play_samples(pcm, rate)
+            
+            # Mise en cache après la lecture : elle ne retarde pas le premier son
+            if len(text) <= CACHE_MAX_TEXT_LEN and self.config.get('keep_audio_files', False):
+                cache_file = self.cache_dir / f"{text_hash}.wav"
+                with wave.open(str(cache_file), 'wb') as out:
+                    out.setnchannels(1)
+                    out.setsampwidth(2)
+                    out.setframerate(rate)
+                    out.writeframes(pcm)
+                self._cache_insert(text_hash, str(cache_file))
+            
+            return True
+            
+        except Exception as e:
+            logger.error(f"Erreur synthèse TTS directe: {e}")
+            return False
+    
+    def _open_pcm(self, params: tuple):
+        """Ouvre la sortie ALSA au besoin et l'adapte au format (débit, canaux, largeur)."""
+        if self._pcm is None:
+            self._pcm = alsaaudio.PCM(alsaaudio.PCM_PLAYBACK,
+                                      device=self.config.get('alsa_device', 'default'))
+            self._pcm_params = None
+        
+        # Reconfigurer seulement si le format diffère du son précédent
+        if params != self._pcm_params:
+            rate, channels, width = params
+            self._pcm.setchannels(channels)
+            self._pcm.setrate(rate)
+            self._pcm.setformat(getattr(alsaaudio, _PCM_FORMATS[width]))
+            self._pcm.setperiodsize(PCM_PERIOD_FRAMES)
+            self._pcm_params = params
+    
+    def _play_samples(self, pcm: bytes, rate: int):
+        """Écrit des échantillons mono int16 dans la sortie ALSA persistante."""
+        period_bytes = PCM_PERIOD_FRAMES * 2
+        view = memoryview(pcm)
+        with self._pcm_lock:
+            try:
+                self._open_pcm((rate, 1, 2))
+                for start in range(0, len(view), period_bytes):
+                    self._pcm.write(view[start:start + period_bytes])
+            except Exception:
+                self._close_pcm()
+                raise
+    
+    def _play_pcm(self, audio_file: str):
+        """Écrit le WAV dans la sortie ALSA persistante (pas de processus par message)."""
+        with self._pcm_lock, wave.open(audio_file, 'rb') as wav:
+            params = (wav.getframerate(), wav.getnchannels(), wav.getsampwidth())
+            
+            try:
+                self._open_pcm(params)
+                
+                frames = wav.readframes(PCM_PERIOD_FRAMES)
+                while frames:
+                    self._pcm.write(frames)
+                    frames = wav.readframes(PCM_PERIOD_FRAMES)
+            except Exception:
+                # Sortie dans un état inconnu : la rouvrir au prochain message
+                self._close_pcm()
+                raise
+    
+    def _close_pcm(self):
+        """Ferme la sortie ALSA persistante."""
+        if self._pcm is not None:
+            try:
+                self._pcm.close()
+            except Exception:
+                pass
+            self._pcm = None
+            self._pcm_params = None
+    
+    def _play_aplay(self, audio_file: str):
+        """Joue le fichier avec aplay (sans pyalsaaudio)."""
+        import subprocess
+        
+        try:
             cmd = ['aplay', '-q', audio_file]
             result = subprocess.run(
                 cmd,
@@ -201,19 +405,59 @@ class TTSWorker:
             
             if result.returncode != 0:
                 logger.error(f"Erreur lecture audio: {result.stderr.decode()}")
+        except subprocess.TimeoutExpired:
+            logger.error("Timeout lecture audio")
+    
+    def play_audio(self, audio_file: str):
+        """
+        Joue un fichier audio.
+        
+        Args:
+            audio_file: Chemin vers le fichier audio
+        """
+        try:
+            # Sortie ALSA directe si pyalsaaudio est installé, sinon aplay
+            if alsaaudio is not None:
+                self._play_pcm(audio_file)
+            else:
+                self._play_aplay(audio_file)
             
-            # Nettoyer le fichier audio (optionnel)
+            # Nettoyer le fichier audio (optionnel) : il quitte aussi le cache
             if not self.config.get('keep_audio_files', False):
+                audio_path = Path(audio_file)
+                with self._cache_lock:
+                    self._audio_cache.pop(audio_path.stem, None)
                 try:
-                    Path(audio_file).unlink()
+                    audio_path.unlink()
                 except:
                     pass
             
-        except subprocess.TimeoutExpired:
-            logger.error("Timeout lecture audio")
+        except FileNotFoundError:
+            logger.error(f"Fichier audio non trouvé: {audio_file}")
         except Exception as e:
             logger.error(f"Erreur lecture audio: {e}")
     
+    def _drain_batch(self, job: TTSJob) -> list:
+        """
+        Retire de la file les messages déjà en attente avec la même priorité que job.
+        
+        Une rafale d'alertes est ainsi synthétisée et jouée en un seul appel au modèle.
+        Renvoie la liste des messages, job en tête, dans l'ordre d'arrivée.
+        """
+        batch = [job]
+        tts_queue = self.tts_queue
+        
+        # Consultation et retrait de la tête du tas sous le même verrou : un message
+        # d'une autre priorité n'est jamais retiré, donc jamais remis dans la file
+        with tts_queue.mutex:
+            heap = tts_queue.queue
+            while len(batch) < MAX_TTS_BATCH and heap and heap[0].priority == job.priority:
+                batch.append(heapq.heappop(heap))
+            if len(batch) > 1:
+                tts_queue.not_full.notify(len(batch) - 1)
+        
+        return batch
+    
     def run(self):
         """Boucle principale du worker TTS."""
         self.running = True
@@ -224,34 +468,48 @@ class TTSWorker:
             try:
                 # Attendre un message (bloquant avec timeout)
                 try:
-                    priority, message_data = self.tts_queue.get(timeout=0.5)
+                    job = self.tts_queue.get(timeout=0.5)
                 except queue.Empty:
                     continue
                 
-                # Extraire les données du message
-                text = message_data.get('text', '')
-                msg_priority = message_data.get('priority', 2)
+                # Regrouper la rafale de messages de même priorité
+                batch = self._drain_batch(job)
+                msg_priority = job.priority
                 
-                if not text:
+                # Textes non vides, sans répétition, dans l'ordre d'arrivée
+                texts = list(dict.fromkeys(j.text for j in batch if j.text))
+                
+                if not texts:
                     logger.warning("Message TTS vide, ignoré")
+                    for _ in batch:
+                        self.tts_queue.task_done()
                     continue
                 
+                text = texts[0] if len(texts) == 1 else ". ".join(t.rstrip(". ") for t in texts)
+                
                 # Marquer comme en train de parler
                 self.currently_speaking = True
                 
-                # Synthétiser la parole
-                audio_file = self.synthesize(text, msg_priority)
-                
-                if audio_file:
-                    # Jouer l'audio
-                    self.play_audio(audio_file)
+                if alsaaudio is not None:
+                    # Échantillons envoyés directement à ALSA, sans fichier intermédiaire
+                    played = self.speak_direct(text, msg_priority)
+                else:
+                    # Synthétiser la parole
+                    audio_file = self.synthesize(text, msg_priority)
                     
+                    # Jouer l'audio
+                    played = audio_file is not None
+                    if played:
+                        self.play_audio(audio_file)
+                
+                if played:
                     # Mettre à jour les statistiques
-                    self.stats['messages_processed'] += 1
+                    self.stats['messages_processed'] += len(batch)
                 
                 # Marquer comme terminé
                 self.currently_speaking = False
-                self.tts_queue.task_done()
+                for _ in batch:
+                    self.tts_queue.task_done()
                 
             except KeyboardInterrupt:
                 break
@@ -274,6 +532,9 @@ class TTSWorker:
             except queue.Empty:
                 break
         
+        with self._pcm_lock:
+            self._close_pcm()
+        
         logger.info("TTSWorker arrêté")
     
     def get_status(self) -> Dict:
@@ -284,7 +545,7 @@ class TTSWorker:
             'model_loaded': self.tts is not None,
             'model_name': self.tts_model,
             'queue_size': self.tts_queue.qsize(),
-            'cache_size': len(self.preloaded_phrases),
+            'cache_size': len(self._audio_cache),
             'stats': self.stats.copy()
         }
     
@@ -295,8 +556,8 @@ class TTSWorker:
             for file in self.cache_dir.glob("*.wav"):
                 file.unlink()
             
-            self.audio_cache.clear()
-            self.preloaded_phrases.clear()
+            with self._cache_lock:
+                self._audio_cache.clear()
             
             logger.info("Cache TTS vidé")
             
@@ -315,4 +576,4 @@ class TTSWorker:
         for phrase in phrases:
             self.preload_phrase(phrase)
         
-        logger.info(f"Cache préchauffé: {len(self.preloaded_phrases)} phrases")
\ No newline at end of file
+        logger.info(f"Cache préchauffé: {len(self._audio_cache)} phrases")
\ No newline at end of file
@@ -1,5 +1,7 @@
 import time
 
+import numpy as np
+
 class NavigationBrain:
     def __init__(self, voice, arduino_comm):
         self.voice = voice
@@ -22,6 +24,21 @@ class NavigationBrain:
         self.OBSTACLE_CLASSES = {
             "chair", "couch", "bed", "table", "bench"
         }
+        
+        # Mêmes classes en identifiants du modèle (voir bind_model)
+        self._class_names = None
+        self._dangerous_id_set = frozenset()
+        self._obstacle_id_set = frozenset()
+        self._dangerous_ids = np.empty(0, dtype=np.int32)
+        self._obstacle_ids = np.empty(0, dtype=np.int32)
+
+    def bind_model(self, names):
+        """Traduire les classes surveillées en identifiants du modèle (names : {id: nom})"""
+        self._class_names = names
+        self._dangerous_id_set = frozenset(i for i, n in names.items() if n in self.DANGEROUS_CLASSES)
+        self._obstacle_id_set = frozenset(i for i, n in names.items() if n in self.OBSTACLE_CLASSES)
+        self._dangerous_ids = np.fromiter(self._dangerous_id_set, dtype=np.int32)
+        self._obstacle_ids = np.fromiter(self._obstacle_id_set, dtype=np.int32)
 
     def get_position(self, bbox, frame_width):
         """Détermine la position de l'objet dans le cadre"""
@@ -68,39 +85,56 @@ class NavigationBrain:
         except:
             pass
 
+    def _class_masks(self, detections):
+        """Boîtes (N, 4) et masques dangereux / obstacle de toutes les détections"""
+        names = getattr(detections, 'names', None)
+        if names is not None:
+            # Tableaux fournis par ObjectDetector : comparaison sur les identifiants de classe
+            if names is not self._class_names:
+                self.bind_model(names)
+            class_ids = detections.class_ids
+            return (detections.bboxes,
+                    np.isin(class_ids, self._dangerous_ids),
+                    np.isin(class_ids, self._obstacle_ids))
+        
+        # Simple liste de dicts : identifiant de classe si disponible, sinon le nom
+        n = len(detections)
+        bboxes = np.array([det["bbox"] for det in detections], dtype=np.float32).reshape(n, 4)
+        if self._class_names is not None and all("class_id" in det for det in detections):
+            dangerous = (det["class_id"] in self._dangerous_id_set for det in detections)
+            obstacle = (det["class_id"] in self._obstacle_id_set for det in detections)
+        else:
+            dangerous = (det["class"] in self.DANGEROUS_CLASSES for det in detections)
+            obstacle = (det["class"] in self.OBSTACLE_CLASSES for det in detections)
+        return (bboxes,
+                np.fromiter(dangerous, dtype=bool, count=n),
+                np.fromiter(obstacle, dtype=bool, count=n))
+
     def process(self, detections, frame_width=640):
         """Traite les détections pour la navigation"""
         if not detections:
             return
 
-        critical_objects = []
-        danger_objects = []
-        aware_objects = []
-
-        for det in detections:
-            obj_class = det["class"]
-            bbox = det["bbox"]
-            position = self.get_position(bbox, frame_width)
-            distance = self.estimate_distance(bbox)
+        # Classification de toutes les détections en une passe vectorisée
+        bboxes, dangerous, obstacle = self._class_masks(detections)
+        heights = bboxes[:, 3] - bboxes[:, 1]  # Distance relative (voir estimate_distance)
 
-            # Classification par priorité
-            if distance > self.CRITICAL_DIST and obj_class in self.DANGEROUS_CLASSES:
-                critical_objects.append((obj_class, position))
-            elif distance > self.DANGER_DIST and obj_class in self.DANGEROUS_CLASSES:
-                danger_objects.append((obj_class, position))
-            elif distance > self.AWARE_DIST and obj_class in self.OBSTACLE_CLASSES:
-                aware_objects.append((obj_class, position))
+        # Traitement par ordre de priorité : l'objet le plus proche de la catégorie la plus grave
+        for mask, level in ((dangerous & (heights > self.CRITICAL_DIST), "critical"),
+                            (dangerous & (heights > self.DANGER_DIST), "danger"),
+                            (obstacle & (heights > self.AWARE_DIST), "aware")):
+            if mask.any():
+                i = int(np.argmax(np.where(mask, heights, -np.inf)))
+                obj = detections[i]["class"]
+                pos = self.get_position(bboxes[i], frame_width)
+                break
+        else:
+            return
 
-        # Traitement par ordre de priorité
-        if critical_objects:
-            obj, pos = critical_objects[0]
+        if level == "critical":
             self.speak_once(f"Attention! {obj} {pos}, très proche")
-            self.beep("critical")
-        elif danger_objects:
-            obj, pos = danger_objects[0]
+        elif level == "danger":
             self.speak_once(f"{obj} {pos}, proche")
-            self.beep("danger")
-        elif aware_objects:
-            obj, pos = aware_objects[0]
+        else:
             self.speak_once(f"{obj} {pos}")
-            self.beep("aware")
\ No newline at end of file
+        self.beep(level)
\ No newline at end of file
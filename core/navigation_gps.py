@@ -1,19 +1,17 @@
 # core/navigation_gps.py
 
-import geopy.distance
-from geopy.geocoders import Nominatim
+from core._geo import geocode, haversine
 
 class NavigationGPS:
     def __init__(self, voice_assistant):
         self.voice = voice_assistant
-        self.geolocator = Nominatim(user_agent="smart_glasses")
         self.destination = None
 
     def set_destination(self, address):
         try:
-            loc = self.geolocator.geocode(address)
+            loc = geocode(address)
             if loc:
-                self.destination = (loc.latitude, loc.longitude)
+                self.destination = loc
                 self.voice.say(f"Destination définie : {address}")
                 return True
         except:
@@ -24,7 +22,4 @@ class NavigationGPS:
         if not self.destination:
             return None
 
-        return geopy.distance.distance(
-            (current_lat, current_lon),
-            self.destination
-        ).meters
+        return haversine(current_lat, current_lon, *self.destination)
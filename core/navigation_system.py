@@ -1,12 +1,11 @@
-import geopy.distance
-from geopy.geocoders import Nominatim
 import threading
 import time
 
+from core._geo import geocode, haversine
+
 class NavigationSystem:
     def __init__(self, voice_assistant):
         self.voice_assistant = voice_assistant
-        self.geolocator = Nominatim(user_agent="smart_glasses")
         self.current_location = None
         self.destination = None
         self.navigation_active = False
@@ -14,9 +13,9 @@ class NavigationSystem:
     def set_destination(self, address):
         """Définir une destination par adresse"""
         try:
-            location = self.geolocator.geocode(address)
+            location = geocode(address)
             if location:
-                self.destination = (location.latitude, location.longitude)
+                self.destination = location
                 self.voice_assistant.speak(f"Destination définie: {address}")
                 return True
         except Exception as e:
@@ -25,7 +24,7 @@ class NavigationSystem:
     
     def calculate_distance(self, coord1, coord2):
         """Calculer la distance entre deux points"""
-        return geopy.distance.distance(coord1, coord2).meters
+        return haversine(coord1[0], coord1[1], coord2[0], coord2[1])
     
     def get_direction_guidance(self, current_lat, current_lon):
         """Obtenir des instructions de navigation"""
@@ -4,50 +4,90 @@ ObjectDetector simple et fonctionnel pour YOLOv8
 
 import cv2
 import numpy as np
-from ultralytics import YOLO
+
+from core._model_registry import load_prefer_onnx
+
+INFERENCE_SIZE = 640  # Taille d'entrée du réseau (grand côté de l'image)
+
+class Detections(list):
+    """
+    Liste des dicts de détection, accompagnée des mêmes données en tableaux NumPy :
+    bboxes (N, 4) xyxy, class_ids (N,), confidences (N,) et les noms de classes du modèle
+    """
+    __slots__ = ('bboxes', 'class_ids', 'confidences', 'names')
+
+    def __init__(self, items=(), bboxes=None, class_ids=None, confidences=None, names=None):
+        super().__init__(items)
+        self.bboxes = np.empty((0, 4), dtype=np.float32) if bboxes is None else bboxes
+        self.class_ids = np.empty(0, dtype=np.int32) if class_ids is None else class_ids
+        self.confidences = np.empty(0, dtype=np.float32) if confidences is None else confidences
+        self.names = names
 
 class ObjectDetector:
-    def __init__(self, model_path="yolov8n.pt"):
+    def __init__(self, model_path="yolov8n.pt", imgsz=INFERENCE_SIZE):
+        self.imgsz = imgsz
+        self._input_buf = None  # Frame réduite, réutilisée d'une frame à l'autre
         try:
-            self.model = YOLO(model_path)
+            self.model = self._load_model(model_path)
             print("✅ YOLOv8 model chargé avec succès!")
         except Exception as e:
             print(f"❌ Erreur chargement YOLO: {e}")
             self.model = None
 
+    def _load_model(self, model_path):
+        """Modèle ONNX int8 (ONNXRuntime) si possible, exporté à la première utilisation"""
+        return load_prefer_onnx(model_path, export_imgsz=self.imgsz)
+
     def detect_objects(self, frame):
         """Détecte les objets dans une frame avec YOLOv8"""
         if self.model is None or frame is None:
             return []
             
         try:
-            # Détection YOLO
-            results = self.model(frame, verbose=False)
-            detections = []
+            # Détection YOLO sur la frame réduite à la taille d'entrée du réseau
+            input_frame, scale = self._resize_input(frame)
+            results = self.model(input_frame, imgsz=self.imgsz, verbose=False)
+            names = self.model.names
+            
+            # Une seule frame en entrée : un seul résultat
+            boxes = results[0].boxes if results else None
+            if boxes is None or len(boxes) == 0:
+                return Detections(names=names)
             
-            for r in results:
-                if r.boxes is not None and len(r.boxes) > 0:
-                    for i, box in enumerate(r.boxes):
-                        # Coordonnées de la bounding box
-                        x1, y1, x2, y2 = box.xyxy[0].tolist()
-                        class_id = int(box.cls[0])
-                        confidence = float(box.conf[0])
-                        
-                        # Nom de la classe
-                        class_name = self.model.names[class_id]
-                        
-                        detections.append({
-                            "class": class_name,
-                            "bbox": [x1, y1, x2, y2],
-                            "confidence": confidence
-                        })
+            # Un seul transfert (N, 6) [x1, y1, x2, y2, conf, cls] pour toutes les boîtes
+            data = boxes.data.cpu().numpy()
+            bboxes = data[:, :4] * scale  # Coordonnées de la frame d'origine
+            confidences = data[:, 4]
+            class_ids = data[:, 5].astype(np.int32)
             
-            return detections
+            items = [{
+                "class": names[class_id],
+                "class_id": class_id,
+                "bbox": bbox,
+                "confidence": confidence
+            } for bbox, confidence, class_id in zip(
+                bboxes.tolist(), confidences.tolist(), class_ids.tolist())]
+            
+            return Detections(items, bboxes, class_ids, confidences, names)
             
         except Exception as e:
             print(f"❌ Erreur lors de la détection: {e}")
             return []
 
+    def _resize_input(self, frame):
+        """Réduire la frame (rapport conservé) dans un tampon réutilisé ; renvoie (image, échelle)"""
+        height, width = frame.shape[:2]
+        scale = self.imgsz / max(height, width)
+        if scale >= 1.0:
+            return frame, 1.0
+        
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        shape = (size[1], size[0]) + frame.shape[2:]
+        if self._input_buf is None or self._input_buf.shape != shape or self._input_buf.dtype != frame.dtype:
+            self._input_buf = np.empty(shape, dtype=frame.dtype)
+        cv2.resize(frame, size, dst=self._input_buf, interpolation=cv2.INTER_AREA)
+        return self._input_buf, max(height, width) / self.imgsz
+
     def draw_detections(self, frame, detections):
         """Dessine les détections sur la frame"""
         for det in detections:
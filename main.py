@@ -1,7 +1,12 @@
-import cv2
 import time
 import sys
 import os
+import logging
+
+# Importé avant numpy/cv2 : fixe les variables d'environnement des threads BLAS/OpenMP
+from config.settings import Config
+
+import cv2
 import numpy as np
 
 # Pour éviter les messages ALSA/Jack sur Raspberry Pi
@@ -20,7 +25,6 @@ try:
     from hardware.camera_manager import CameraManager
     from hardware.arduino_communication import ArduinoCommunication
     from core.object_detector import ObjectDetector
-    from core.face_recognizer import FaceRecognizer
     from core.text_recognizer import TextRecognizer
     from core.navigation_brain import NavigationBrain
     from core.ai_assistant import AIAssistant
@@ -50,6 +54,7 @@ except ImportError as e:
 # ------------------- VoiceAssistant optimisé -------------------
 import threading
 import queue
+from collections.abc import Mapping
 import platform
 import subprocess
 
@@ -271,6 +276,9 @@ class SmartGlassesSystem:
                 voice=self.voice_assistant,
                 arduino_comm=self.arduino_comm
             )
+            # Classes surveillées résolues une fois en identifiants du modèle
+            if self.object_detector and self.object_detector.model is not None:
+                self.navigation_brain.bind_model(self.object_detector.model.names)
             print("✅ NavigationBrain initialisé (mode hérité)")
         except:
             self.navigation_brain = None
@@ -300,6 +308,9 @@ class SmartGlassesSystem:
         self.last_nav_state_display = 0
         self.nav_state_display_interval = 5.0  # Afficher l'état toutes les 5 secondes
 
+        # Thread d'acquisition caméra (créé par start())
+        self.grabber_thread = None
+
         print("✅ Système initialisé avec succès!")
 
     # ==================== NOUVELLE MÉTHODE: INITIALISATION NAVIGATION ====================
@@ -352,8 +363,8 @@ class SmartGlassesSystem:
         """Configuration de la reconnaissance faciale avec known_faces"""
         try:
             # Utiliser le vrai module de reconnaissance faciale
-            from core.face_recognizer import FaceRecognizer
-            self.face_recognizer = FaceRecognizer()
+            from core.face_recognizer import get_face_recognizer
+            self.face_recognizer = get_face_recognizer()
             self.face_recognition_enabled = True
             print("✅ Reconnaissance faciale avancée initialisée")
             
@@ -565,8 +576,45 @@ class SmartGlassesSystem:
         # ==================== FIN NOUVEAU ====================
         
         self.running = True
+        
+        # Acquisition caméra dans son propre thread : la lecture V4L2 se fait
+        # pendant l'inférence de la frame précédente
+        self.frame_queue = queue.Queue(maxsize=1)
+        self.grabber_thread = threading.Thread(
+            target=self._grab_frames,
+            daemon=True,
+            name="CameraGrabber"
+        )
+        self.grabber_thread.start()
+        
         self.main_loop()
 
+    def _grab_frames(self):
+        """Lire la caméra en continu en ne gardant que la frame la plus récente"""
+        while self.running:
+            try:
+                frame = self.camera.get_frame()
+            except Exception as e:
+                print(f"❌ Erreur acquisition caméra: {e}")
+                frame = None
+            
+            if frame is None:
+                time.sleep(0.05)
+                continue
+            
+            try:
+                self.frame_queue.put_nowait(frame)
+            except queue.Full:
+                # Remplacer la frame périmée par la nouvelle
+                try:
+                    self.frame_queue.get_nowait()
+                except queue.Empty:
+                    pass
+                try:
+                    self.frame_queue.put_nowait(frame)
+                except queue.Full:
+                    pass
+
     def main_loop(self):
         """Boucle principale optimisée"""
         last_processing_time = 0
@@ -580,7 +628,6 @@ class SmartGlassesSystem:
         while self.running:
             try:
                 current_time = time.time()
-                frame_count += 1
 
                 # Log périodique (toutes les 10 secondes)
                 if current_time - last_log_time >= 10:
@@ -594,7 +641,7 @@ class SmartGlassesSystem:
                 if self.navigation_module and current_time - self.last_nav_state_display >= self.nav_state_display_interval:
                     try:
                         state = self.navigation_module.get_state()
-                        if state and isinstance(state, dict):
+                        if state and isinstance(state, Mapping):
                             # Vérifie que les clés existent
                             module_state = state.get('module_state', 'unknown')
                             eoh_snapshot = state.get('eoh_snapshot', {})
@@ -613,21 +660,12 @@ class SmartGlassesSystem:
                         print(f"⚠️  Erreur monitoring navigation: {e}")
                 # ==================== FIN NOUVEAU ====================
 
-                # Acquisition frame avec timeout
-                frame_start = time.time()
-                frame = None
-                
-                if self.camera:
-                    frame = self.camera.get_frame()
-                
-                if frame is None:
-                    # Attente réduite pour frame vide
-                    time.sleep(0.05)
+                # Acquisition frame avec timeout (fournie par le thread de capture)
+                try:
+                    frame = self.frame_queue.get(timeout=0.1)
+                except queue.Empty:
                     continue
-
-                frame_time = time.time() - frame_start
-                if frame_time > 0.1:  # Si capture trop lente
-                    print(f"⚠️ Capture lente: {frame_time:.2f}s")
+                frame_count += 1
 
                 # Traitement selon le mode (avec intervalle)
                 if current_time - last_processing_time >= processing_interval:
@@ -831,6 +869,11 @@ class SmartGlassesSystem:
                 print(f"❌ Erreur arrêt module navigation: {e}")
         # ==================== FIN NOUVEAU ====================
         
+        # Attendre la fin du thread de capture avant de libérer la caméra
+        if self.grabber_thread:
+            self.grabber_thread.join(timeout=1.0)
+            self.grabber_thread = None
+        
         # Arrêter les autres ressources
         if self.camera:
             try:
@@ -863,7 +906,13 @@ class SmartGlassesSystem:
         print("✅ Système arrêté proprement")
 
 if __name__ == "__main__":
+    # stderr est redirigé vers DEVNULL : journaliser sur stdout
+    logging.basicConfig(
+        level=logging.DEBUG if Config.DEBUG_MODE else logging.INFO,
+        stream=sys.stdout
+    )
     try:
+        Config.apply_runtime()
         glasses = SmartGlassesSystem()
         glasses.start()
     except KeyboardInterrupt:
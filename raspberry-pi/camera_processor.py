@@ -5,7 +5,7 @@ import numpy as np
 
 # Importations conditionnelles pour éviter les 
 try:
-    from core.face_recognizer import FaceRecognizer
+    from core.face_recognizer import get_face_recognizer
     from core.text_recognizer import TextRecognizer
     from core.object_detector import ObjectDetector
     MODULES_LOADED = True
@@ -22,7 +22,7 @@ class CameraProcessor:
         self.cap_rpi = None
         
         if MODULES_LOADED:
-            self.face_recognizer = FaceRecognizer()
+            self.face_recognizer = get_face_recognizer()
             self.text_recognizer = TextRecognizer() 
             self.object_detector = ObjectDetector()
         else:
@@ -84,10 +84,7 @@ class CameraProcessor:
                 # Traitement selon les modules disponibles
                 if self.face_recognizer:
                     faces = self.face_recognizer.detect_faces(frame)
-                    for (x, y, w, h) in faces:
-                        cv2.rectangle(frame, (x, y), (x+w, y+h), (255, 0, 0), 2)
-                        cv2.putText(frame, "Visage", (x, y-10), 
-                                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 1)
+                    self.face_recognizer.draw_faces(frame, faces)
                 
                 if self.text_recognizer:
                     bills = self.text_recognizer.detect_bills(frame)
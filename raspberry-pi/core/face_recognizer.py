@@ -3,12 +3,16 @@ import face_recognition
 import numpy as np
 import os
 import pickle
+import logging
+
+logger = logging.getLogger(__name__)
 
 class FaceRecognizer:
     def __init__(self):
         print("👤 Initialisation reconnaissance faciale...")
         self.known_face_encodings = []
         self.known_face_names = []
+        self._rgb_buf = None
         self.load_known_faces()
         
     def load_known_faces(self):
@@ -36,8 +40,10 @@ class FaceRecognizer:
     def detect_faces(self, frame):
         """Détecter et reconnaître les visages"""
         try:
-            # Convertir BGR to RGB
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # Convertir BGR to RGB dans un tampon réutilisé
+            if self._rgb_buf is None or self._rgb_buf.shape != frame.shape:
+                self._rgb_buf = np.empty_like(frame)
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
             
             # Détecter tous les visages
             face_locations = face_recognition.face_locations(rgb_frame)
@@ -47,23 +53,23 @@ class FaceRecognizer:
             
             for (top, right, bottom, left), face_encoding in zip(face_locations, face_encodings):
                 # Comparer avec les visages connus
+                # compare_faces n'est qu'un seuil sur face_distance : un seul calcul suffit
                 name = "Inconnu"
+                distance = None
                 if self.known_face_encodings:
-                    matches = face_recognition.compare_faces(self.known_face_encodings, face_encoding)
                     face_distances = face_recognition.face_distance(self.known_face_encodings, face_encoding)
-                    
-                    if True in matches:
-                        best_match_index = np.argmin(face_distances)
-                        if face_distances[best_match_index] < 0.6:
-                            name = self.known_face_names[best_match_index]
+                    best_match_index = int(np.argmin(face_distances))
+                    if face_distances[best_match_index] < 0.6:
+                        name = self.known_face_names[best_match_index]
+                        distance = face_distances[best_match_index]
                 
                 face_info.append({
                     'name': name,
                     'location': (left, top, right, bottom),
-                    'distance': face_distances[best_match_index] if name != "Inconnu" else None
+                    'distance': distance
                 })
                 
-                print(f"👤 {name} détecté")
+                logger.debug("👤 %s détecté", name)
                 
             return face_info
             
@@ -72,25 +78,9 @@ class FaceRecognizer:
             return []
         
     def setup(self):
-        print("👤 Initialisation reconnaissance faciale...")
-        # Charger les visages connus depuis la base de données
-        self.load_known_faces()
-    
-    def load_known_faces(self):
-        """Charge les visages connus depuis le dossier faces/"""
-        # À implémenter selon ta structure
-        pass
-        
-    def detect_faces(self, frame):
-        """Détecte tous les visages dans l'image"""
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        face_locations = face_recognition.face_locations(rgb_frame)
-        return face_locations
-    
-    def recognize_face(self, face_image):
-        """Reconnaît un visage spécifique"""
-        # Implémentation de la reconnaissance
-        return None
+        """Les visages sont chargés dans __init__ : ne recharger que si la base est vide"""
+        if not self.known_face_encodings:
+            self.load_known_faces()
 
     def draw_faces(self, frame, faces):
         """Dessiner les visages sur l'image"""
@@ -112,4 +102,14 @@ class FaceRecognizer:
             
             # Texte
             cv2.putText(frame, label, (left, bottom - 5), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
\ No newline at end of file
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+
+
+_singleton = None
+
+def get_face_recognizer():
+    """Instance partagée : les visages connus ne sont chargés qu'une seule fois"""
+    global _singleton
+    if _singleton is None:
+        _singleton = FaceRecognizer()
+    return _singleton
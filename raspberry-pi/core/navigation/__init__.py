@@ -1,28 +1,34 @@
 """
 Module de navigation pour smart-glasses.
 """
+import importlib
+
 from .navigation_module import NavigationModule, NavigationState
 
-# Importations simples sans try/except complexes
-try:
-    from .fusion.eoh import EgocentricOccupancyHistogram
-except ImportError:
-    EgocentricOccupancyHistogram = None
-
-try:
-    from .decision.priority_engine import PriorityEngine
-except ImportError:
-    PriorityEngine = None
-
-try:
-    from .adapters.camera_adapter import CameraAdapter
-except ImportError:
-    CameraAdapter = None
-
-try:
-    from .adapters.hc_sr04_adapter import UltrasonicAdapter
-except ImportError:
-    UltrasonicAdapter = None
+# Sous-modules lourds importés au premier accès (PEP 562)
+_lazy = {
+    'EgocentricOccupancyHistogram': ('.fusion.eoh', 'EgocentricOccupancyHistogram'),
+    'PriorityEngine': ('.decision.priority_engine', 'PriorityEngine'),
+    'CameraAdapter': ('.adapters.camera_adapter', 'CameraAdapter'),
+    'UltrasonicAdapter': ('.adapters.hc_sr04_adapter', 'UltrasonicAdapter'),
+}
+
+
+def __getattr__(name):
+    if name not in _lazy:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    mod, attr = _lazy[name]
+    try:
+        value = getattr(importlib.import_module(mod, __name__), attr)
+    except ImportError:
+        value = None
+    globals()[name] = value  # Les accès suivants ne repassent plus par ici
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_lazy))
+
 
 __version__ = "1.0.0"
 __all__ = [
@@ -0,0 +1,7 @@
+"""
+Compatibilité entre versions de Python pour le module de navigation.
+"""
+import sys
+
+# __slots__ : pas de __dict__ par instance (option disponible à partir de Python 3.10)
+DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
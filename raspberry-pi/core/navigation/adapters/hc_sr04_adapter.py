@@ -83,20 +83,20 @@ class UltrasonicAdapter:
                 if time.time() - timeout_start > 0.1:  # 100ms timeout
                     raise TimeoutError("Timeout attente echo HIGH")
             
-            # Mesurer le temps HIGH
-            pulse_start = time.time()
-            timeout_start = time.time()
+            # Mesurer le temps HIGH (une seule lecture d'horloge par itération,
+            # partagée par le calcul de durée, le timeout et l'horodatage)
+            pulse_start = pulse_end = time.time()
             
             while self.gpio.input(self.echo_pin) == 1:
                 pulse_end = time.time()
                 if pulse_end - pulse_start > self.max_time:
                     # Distance supérieure au maximum
                     self.last_distance = self.max_distance
-                    self.last_read_time = time.time()
+                    self.last_read_time = pulse_end
                     self.error_count = 0
                     return self.max_distance
                 
-                if time.time() - timeout_start > 0.1:  # 100ms timeout
+                if pulse_end - pulse_start > 0.1:  # 100ms timeout
                     raise TimeoutError("Timeout attente echo LOW")
             
             # Calculer la distance
@@ -115,7 +115,7 @@ class UltrasonicAdapter:
                 distance = alpha * distance + (1 - alpha) * self.last_distance
             
             self.last_distance = distance
-            self.last_read_time = time.time()
+            self.last_read_time = pulse_end
             self.error_count = 0
             
             return distance
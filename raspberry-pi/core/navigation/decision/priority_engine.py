@@ -1,7 +1,7 @@
 """
 Moteur de priorité pour les alertes de navigation.
 """
-import time
+import bisect
 import logging
 from enum import Enum
 from typing import Dict, Optional
@@ -34,7 +34,13 @@ class AlertType(Enum):
     PATH_CLEAR = "path_clear"
     SYSTEM_INFO = "system_info"
 
-@dataclass
+# __slots__ : pas de __dict__ par instance (option disponible à partir de Python 3.10)
+try:
+    _slotted_dataclass = dataclass(slots=True)
+except TypeError:
+    _slotted_dataclass = dataclass
+
+@_slotted_dataclass
 class Decision:
     action_needed: bool = False
     message: str = ""
@@ -44,52 +50,86 @@ class Decision:
     confidence: float = 0.0
     new_state: Optional[NavigationState] = None
 
+# Niveaux d'alerte, du plus proche au plus lointain, puis "rien à signaler".
+# (action_needed, message %d en cm, priorité, type d'alerte, nouvel état)
+_LEVEL_TEMPLATES = (
+    (True, "Attention! Obstacle très proche à %d cm. Arrêtez!",
+     AlertPriority.EMERGENCY.value, AlertType.OBSTACLE_EMERGENCY.value, NavigationState.EMERGENCY),
+    (True, "Obstacle à %d cm. Ralentissez.",
+     AlertPriority.HIGH.value, AlertType.OBSTACLE_ALERT.value, NavigationState.ALERT),
+    (True, "Obstacle à %d cm. Prudence.",
+     AlertPriority.MEDIUM.value, AlertType.OBSTACLE_WARNING.value, NavigationState.SCANNING),
+    (False, "",
+     AlertPriority.INFO.value, AlertType.SYSTEM_INFO.value, None),
+)
+
 class PriorityEngine:
     def __init__(self, emergency_dist: float = 35.0, alert_dist: float = 100.0,
                  warning_dist: float = 200.0, min_vocal_interval: float = 2.5):
-        self.emergency_dist = emergency_dist
-        self.alert_dist = alert_dist
-        self.warning_dist = warning_dist
+        # Seuils croissants : bisect_right donne l'indice du niveau (distance < seuil)
+        self._thresholds = (emergency_dist, alert_dist, warning_dist)
         self.min_vocal_interval = min_vocal_interval
         
+        # Une Decision pré-remplie par niveau, réutilisée : seul le message change
+        self._decisions = tuple(
+            Decision(action_needed=action_needed, priority=priority,
+                     suggested_action="continue", alert_type=alert_type, new_state=new_state)
+            for action_needed, _, priority, alert_type, new_state in _LEVEL_TEMPLATES)
+        self._message_formats = tuple(template[1] for template in _LEVEL_TEMPLATES)
+        
         logger.info(f"PriorityEngine initialisé")
     
-    def evaluate(self, eoh_snapshot, current_state: NavigationState = NavigationState.SCANNING) -> Decision:
-        current_time = time.time()
-        decision = Decision(
-            action_needed=False,
-            message="",
-            priority=AlertPriority.INFO.value,
-            suggested_action="continue",
-            alert_type=AlertType.SYSTEM_INFO.value,
-            confidence=0.0,
-            new_state=None
+    # Les seuils sont lus depuis _thresholds : les setters le reconstruisent
+    # pour qu'un changement à chaud (set_thresholds) soit pris en compte.
+    @property
+    def emergency_dist(self) -> float:
+        return self._thresholds[0]
+    
+    @emergency_dist.setter
+    def emergency_dist(self, value: float):
+        self.set_thresholds(emergency_dist=value)
+    
+    @property
+    def alert_dist(self) -> float:
+        return self._thresholds[1]
+    
+    @alert_dist.setter
+    def alert_dist(self, value: float):
+        self.set_thresholds(alert_dist=value)
+    
+    @property
+    def warning_dist(self) -> float:
+        return self._thresholds[2]
+    
+    @warning_dist.setter
+    def warning_dist(self, value: float):
+        self.set_thresholds(warning_dist=value)
+    
+    def set_thresholds(self, emergency_dist: Optional[float] = None,
+                       alert_dist: Optional[float] = None,
+                       warning_dist: Optional[float] = None):
+        """Met à jour un ou plusieurs seuils de distance (cm)."""
+        emergency, alert, warning = self._thresholds
+        self._thresholds = (
+            emergency if emergency_dist is None else emergency_dist,
+            alert if alert_dist is None else alert_dist,
+            warning if warning_dist is None else warning_dist,
         )
+    
+    def evaluate(self, eoh_snapshot, current_state: NavigationState = NavigationState.SCANNING) -> Decision:
+        """
+        Évalue le snapshot EOH.
         
-        if eoh_snapshot.min_distance is None:
-            return decision
-        
+        La Decision retournée est réutilisée par les appels suivants : la copier
+        (dataclasses.replace) pour la conserver, et ne pas modifier ses champs.
+        Ne pas appeler evaluate() depuis plusieurs threads à la fois.
+        """
         min_distance = eoh_snapshot.min_distance
+        if min_distance is None:
+            return self._decisions[-1]
         
-        if min_distance < self.emergency_dist:
-            decision.action_needed = True
-            decision.message = f"Attention! Obstacle très proche à {int(min_distance)} cm. Arrêtez!"
-            decision.priority = AlertPriority.EMERGENCY.value
-            decision.alert_type = AlertType.OBSTACLE_EMERGENCY.value
-            decision.new_state = NavigationState.EMERGENCY
-            
-        elif min_distance < self.alert_dist:
-            decision.action_needed = True
-            decision.message = f"Obstacle à {int(min_distance)} cm. Ralentissez."
-            decision.priority = AlertPriority.HIGH.value
-            decision.alert_type = AlertType.OBSTACLE_ALERT.value
-            decision.new_state = NavigationState.ALERT
-            
-        elif min_distance < self.warning_dist:
-            decision.action_needed = True
-            decision.message = f"Obstacle à {int(min_distance)} cm. Prudence."
-            decision.priority = AlertPriority.MEDIUM.value
-            decision.alert_type = AlertType.OBSTACLE_WARNING.value
-            decision.new_state = NavigationState.SCANNING
-        
+        level = bisect.bisect_right(self._thresholds, min_distance)
+        decision = self._decisions[level]
+        if decision.action_needed:
+            decision.message = self._message_formats[level] % min_distance  # %d tronque comme int()
         return decision
\ No newline at end of file
@@ -1,15 +1,378 @@
-class EgocentricOccupancyHistogram:
-    """Histogramme d'occupation égocentrique (EOH)."""
+"""
+Histogramme d'Occupation Égocentrique (Egocentric Occupancy Histogram).
+"""
+import json
+import time
+import threading
+import numpy as np
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict
+import logging
+
+try:
+    from numba import njit
+except ImportError:  # Numba optionnel : update_many garde alors sa version NumPy
+    njit = None
+
+try:
+    import orjson
+except ImportError:  # orjson optionnel : to_json retombe sur le module json
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Tous les timestamps de l'EOH viennent de time.monotonic() : insensible aux sauts
+# de l'horloge murale (NTP au démarrage du Pi), qui fausseraient l'EMA et l'expiration
+CLEAN_INTERVAL = 0.5  # Secondes minimum entre deux nettoyages déclenchés par update()
+SNAPSHOT_TTL = 0.1    # Durée de réutilisation d'un snapshot quand l'histogramme n'a pas changé
+NO_CLASS = -1         # Code de classe d'un bin sans objet identifié
+
+@dataclass
+class Bin:
+    min_distance: float = float('inf')
+    last_update: float = 0.0  # time.monotonic()
+    confidence: float = 0.0
+    object_class: Optional[str] = None
+
+@dataclass
+class EOHSnapshot:
+    # Copies des tableaux de l'histogramme (un élément par bin)
+    distances: np.ndarray
+    confidences: np.ndarray
+    last_updates: np.ndarray
+    class_codes: np.ndarray
+    class_names: List[str]  # Table code → nom de l'EOH (uniquement complétée)
+    bin_centers: np.ndarray
+    min_distance: Optional[float]
+    closest_bearing: float
+    timestamp: float
+    _dict: Optional[Dict] = field(default=None, init=False, repr=False, compare=False)
+    _json: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
     
-    def __init__(self, bins=13):
-        self.bins = bins
-        self.histogram = [{'min_distance': float('inf')} for _ in range(bins)]
-        print("✓ EOH initialisé avec", bins, "bins")
+    @property
+    def object_classes(self) -> List[Optional[str]]:
+        """Nom de la classe de chaque bin, None si aucune."""
+        names = self.class_names
+        return [names[code] if code != NO_CLASS else None for code in self.class_codes.tolist()]
+    
+    @property
+    def bins(self) -> List[Bin]:
+        """Bins sous forme de dataclasses, construits à la demande."""
+        return [Bin(d, t, c, cls) for d, t, c, cls in zip(
+            self.distances.tolist(), self.last_updates.tolist(),
+            self.confidences.tolist(), self.object_classes)]
     
-    def update(self, detections):
-        print(f"EOH mis à jour avec {len(detections)} détections")
-        # Implémentation temporaire
-        return True
+    def get_bin_distances(self) -> List[Optional[float]]:
+        """Distance de chaque bin, None si le bin est vide."""
+        # Conversion inf → None en une seule opération sur le tableau
+        distances = self.distances.astype(object)
+        distances[np.isinf(self.distances)] = None
+        return distances.tolist()
     
-    def get_snapshot(self):
-        return {'bins': self.bins, 'state': 'actif'}
\ No newline at end of file
+    def to_dict(self):
+        """Dictionnaire sérialisable, construit une seule fois par snapshot (à ne pas modifier)."""
+        if self._dict is None:
+            self._dict = {
+                'min_distance': self.min_distance if self.min_distance != float('inf') else None,
+                'closest_bearing': self.closest_bearing,
+                'timestamp': self.timestamp,
+                'bins': [
+                    {
+                        'min_distance': d,
+                        'confidence': c,
+                        'object_class': cls
+                    }
+                    for d, c, cls in zip(self.get_bin_distances(),
+                                         self.confidences.tolist(), self.object_classes)
+                ]
+            }
+        return self._dict
+    
+    def to_json(self) -> bytes:
+        """JSON de to_dict(), encodé une seule fois par snapshot."""
+        if self._json is None:
+            if orjson is None:
+                self._json = json.dumps(self.to_dict()).encode('utf-8')
+            elif self._dict is not None:
+                self._json = orjson.dumps(self._dict)
+            else:
+                # orjson écrit inf en null : pas de passe inf → None sur les distances
+                self._json = orjson.dumps({
+                    'min_distance': self.min_distance,
+                    'closest_bearing': self.closest_bearing,
+                    'timestamp': self.timestamp,
+                    'bins': [
+                        {
+                            'min_distance': d,
+                            'confidence': c,
+                            'object_class': cls
+                        }
+                        for d, c, cls in zip(self.distances.tolist(),
+                                             self.confidences.tolist(), self.object_classes)
+                    ]
+                }, option=orjson.OPT_SERIALIZE_NUMPY)
+        return self._json
+
+def _ema_batch(idx, distances, confidences, codes, min_distance, confidence, last_update,
+               class_code, timestamp, ema_alpha):
+    """EMA et classes de update() appliquées sur place, une mesure par bin distinct."""
+    keep = 1.0 - ema_alpha
+    for k in range(idx.shape[0]):
+        i = idx[k]
+        if min_distance[i] == np.inf or timestamp - last_update[i] > 1.0:
+            min_distance[i] = distances[k]
+            confidence[i] = confidences[k]
+        else:
+            min_distance[i] = ema_alpha * distances[k] + keep * min_distance[i]
+            confidence[i] = ema_alpha * confidences[k] + keep * confidence[i]
+        last_update[i] = timestamp
+        if codes[k] != NO_CLASS:
+            class_code[i] = codes[k]
+
+# Compilé seulement si Numba est installé. Pas de prange : au plus un élément par
+# bin (13 par défaut), le lancement de threads coûterait plus que la boucle.
+# Pas de fastmath non plus : les bins vides valent inf.
+_ema_batch_jit = njit(cache=True)(_ema_batch) if njit is not None else None
+
+class EgocentricOccupancyHistogram:
+    def __init__(self, bins: int = 13, fov_deg: float = 62.2, ema_alpha: float = 0.4):
+        self.bins = bins
+        self.fov = fov_deg
+        self.ema_alpha = ema_alpha
+        # Coefficient de rétention du filtre (pôle unique), calculé une fois
+        self._ema_keep = 1.0 - ema_alpha
+        
+        # Structure de tableaux : une entrée par bin dans chaque tableau
+        self.min_distance = np.full(bins, np.inf, dtype=np.float32)
+        self.last_update = np.zeros(bins, dtype=np.float64)
+        self.confidence = np.zeros(bins, dtype=np.float32)
+        
+        # Classes codées en int16 ; _class_codes interne chaque nom une seule fois
+        self.class_code = np.full(bins, NO_CLASS, dtype=np.int16)
+        self._class_codes: Dict[str, int] = {}
+        self._class_names: List[str] = []
+        self._last_clean_ts = 0.0
+        
+        # Snapshot réutilisé tant qu'aucun bin n'a changé (décision, télémétrie, état)
+        self._version = 0
+        # Signalé à chaque modification : le thread de décision attend dessus au lieu de sonder
+        self.changed = threading.Event()
+        self._cached_snapshot: Optional[EOHSnapshot] = None
+        self._snapshot_version = -1
+        
+        logger.info(f"EOH initialisé avec {bins} bins")
+
+    @property
+    def fov(self) -> float:
+        return self._fov_span
+
+    @fov.setter
+    def fov(self, fov_deg: float):
+        """Change le champ de vision et recalcule les bornes des bins."""
+        self.bin_edges = np.linspace(-fov_deg/2, fov_deg/2, self.bins + 1)
+        self.bin_centers = (self.bin_edges[:-1] + self.bin_edges[1:]) / 2
+        
+        # Bins uniformes : indice calculé directement à partir du bearing
+        self._half_fov = fov_deg / 2.0
+        self._fov_span = float(fov_deg)
+        self._inv_bin_width = self.bins / fov_deg
+
+    def update(self, bearing: float, distance: float, confidence: float = 1.0, 
+               object_class: Optional[str] = None, timestamp: Optional[float] = None):
+        if timestamp is None:
+            timestamp = time.monotonic()
+        
+        # Trouver le bin (bords inclus, comme bin_edges)
+        offset = bearing + self._half_fov
+        if not 0.0 <= offset <= self._fov_span:
+            return
+        bin_idx = min(int(offset * self._inv_bin_width), self.bins - 1)
+        
+        previous_distance = float(self.min_distance[bin_idx])
+        
+        # EMA : bin vide ou mesure précédente trop ancienne (alpha = 1), la mesure remplace l'état
+        if previous_distance == float('inf') or timestamp - self.last_update[bin_idx] > 1.0:
+            weighted_distance = distance
+            weighted_confidence = confidence
+        else:
+            alpha = self.ema_alpha
+            keep = self._ema_keep
+            weighted_distance = alpha * distance + keep * previous_distance
+            weighted_confidence = alpha * confidence + keep * float(self.confidence[bin_idx])
+        
+        # Mettre à jour
+        self.min_distance[bin_idx] = weighted_distance
+        self.confidence[bin_idx] = weighted_confidence
+        self.last_update[bin_idx] = timestamp
+        if object_class:
+            self.class_code[bin_idx] = self._code(object_class)
+        self._version += 1
+        self.changed.set()
+        
+        # Nettoyer les vieux bins (get_snapshot nettoie de toute façon avant lecture)
+        if timestamp - self._last_clean_ts > CLEAN_INTERVAL:
+            self._clean_old_bins(timestamp)
+            self._last_clean_ts = timestamp
+
+    def update_many(self, bearings, distances, confidences,
+                    object_classes: Optional[List[Optional[str]]] = None,
+                    timestamp: Optional[float] = None):
+        """
+        Met à jour l'histogramme avec toutes les détections d'une frame en une passe.
+        
+        Les mesures sont regroupées par bin et seule la plus proche de chaque bin
+        est retenue (l'obstacle le plus proche prime) : chaque bin reçoit au plus
+        un pas d'EMA, comme un appel à update() avec cette mesure. Boucle compilée
+        par Numba si disponible, sinon version NumPy.
+        
+        Args:
+            bearings: Angles en degrés (séquence ou tableau).
+            distances: Distances associées.
+            confidences: Confiances associées.
+            object_classes: Classes associées (optionnel).
+            timestamp: Timestamp commun. Par défaut, time.monotonic().
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        
+        # Vider les bins périmés avant d'écrire : une classe expirée ne doit pas survivre
+        if timestamp - self._last_clean_ts > CLEAN_INTERVAL:
+            self._clean_old_bins(timestamp)
+            self._last_clean_ts = timestamp
+        
+        offsets = np.asarray(bearings, dtype=np.float64) + self._half_fov
+        valid = (offsets >= 0.0) & (offsets <= self._fov_span)
+        if not valid.any():
+            return
+        
+        items = np.flatnonzero(valid)
+        idx = np.minimum((offsets[items] * self._inv_bin_width).astype(np.intp), self.bins - 1)
+        x_dist = np.asarray(distances, dtype=np.float64)[items]
+        
+        # Tri par bin puis par distance : la première mesure de chaque bin est la plus
+        # proche (à égalité, la première arrivée). Les bins sont ensuite traités dans l'ordre.
+        order = np.lexsort((x_dist, idx))
+        sorted_idx = idx[order]
+        first = np.empty(len(order), dtype=bool)
+        first[0] = True
+        np.not_equal(sorted_idx[1:], sorted_idx[:-1], out=first[1:])
+        nearest = order[first]
+        
+        items = items[nearest]
+        idx = sorted_idx[first]
+        x_dist = x_dist[nearest]
+        x_conf = np.asarray(confidences, dtype=np.float64)[items]
+        
+        # Codes des classes (NO_CLASS si absente) : seul passage par les noms
+        if object_classes is not None:
+            codes = np.fromiter(
+                (self._code(object_classes[item]) if object_classes[item] else NO_CLASS
+                 for item in items.tolist()),
+                dtype=np.int16, count=len(items))
+        else:
+            codes = np.full(len(items), NO_CLASS, dtype=np.int16)
+        
+        if _ema_batch_jit is not None:
+            _ema_batch_jit(idx, x_dist, x_conf, codes, self.min_distance, self.confidence,
+                           self.last_update, self.class_code, float(timestamp),
+                           float(self.ema_alpha))
+        else:
+            self._ema_step(idx, x_dist, x_conf, codes, timestamp)
+        self._version += 1
+        self.changed.set()
+
+    def _ema_step(self, idx, x_dist, x_conf, codes, timestamp: float):
+        """Un pas d'EMA par bin (bins distincts), même règle que update()."""
+        prev_dist = self.min_distance[idx]
+        # Bin vide ou mesure précédente trop ancienne (alpha = 1) : la mesure remplace l'état
+        blend = np.isfinite(prev_dist) & (timestamp - self.last_update[idx] <= 1.0)
+        if blend.any():
+            alpha = self.ema_alpha
+            keep = self._ema_keep
+            x_dist[blend] = alpha * x_dist[blend] + keep * prev_dist[blend]
+            x_conf[blend] = alpha * x_conf[blend] + keep * self.confidence[idx[blend]]
+        
+        self.min_distance[idx] = x_dist
+        self.confidence[idx] = x_conf
+        self.last_update[idx] = timestamp
+        labelled = codes != NO_CLASS
+        self.class_code[idx[labelled]] = codes[labelled]
+
+    def _code(self, object_class: str) -> int:
+        """Code entier de la classe, attribué au premier usage."""
+        code = self._class_codes.get(object_class)
+        if code is None:
+            code = self._class_codes[object_class] = len(self._class_names)
+            self._class_names.append(object_class)
+        return code
+
+    def _clean_old_bins(self, current_time: float, max_age: float = 2.0):
+        # Seuls les bins encore occupés sont à vider
+        stale = (current_time - self.last_update > max_age) & np.isfinite(self.min_distance)
+        if not stale.any():
+            return
+        self.min_distance[stale] = np.inf
+        self.confidence[stale] = 0.0
+        self.class_code[stale] = NO_CLASS
+        self._version += 1
+        self.changed.set()
+
+    def get_snapshot(self) -> EOHSnapshot:
+        current_time = time.monotonic()
+        self._clean_old_bins(current_time)
+        
+        version = self._version
+        cached = self._cached_snapshot
+        if (cached is not None and self._snapshot_version == version
+                and current_time - cached.timestamp < SNAPSHOT_TTL):
+            return cached
+        
+        # argmin retourne le premier minimum, comme la recherche stricte d'origine
+        closest_bin_idx = int(np.argmin(self.min_distance))
+        min_distance = float(self.min_distance[closest_bin_idx])
+        
+        if min_distance == float('inf'):
+            min_distance = None
+            closest_bearing = 0.0
+        else:
+            closest_bearing = float(self.bin_centers[closest_bin_idx])
+        
+        snapshot = EOHSnapshot(
+            distances=self.min_distance.copy(),
+            confidences=self.confidence.copy(),
+            last_updates=self.last_update.copy(),
+            class_codes=self.class_code.copy(),
+            class_names=self._class_names,
+            bin_centers=self.bin_centers,
+            min_distance=min_distance,
+            closest_bearing=closest_bearing,
+            timestamp=current_time
+        )
+        self._cached_snapshot = snapshot
+        self._snapshot_version = version
+        return snapshot
+
+    def update_ultrasound_only(self, distance: float, angle: float = 0.0, timestamp: Optional[float] = None):
+        """
+        Met à jour l'histogramme avec une mesure ultrasonique isolée.
+        
+        Args:
+            distance (float): Distance en mètres.
+            angle (float): Angle en degrés (comme bearing). Par défaut 0 (capteur dans l'axe).
+            timestamp (float, optional): Timestamp. Par défaut, time.monotonic().
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        
+        # Convertir l'angle en degrés si nécessaire (supposé déjà en degrés)
+        # Si ton angle est en radians, utilise: bearing_deg = np.degrees(angle)
+        bearing_deg = angle
+        
+        self.update(
+            bearing=bearing_deg,
+            distance=distance,
+            confidence=1.0,
+            object_class="ultrasound",
+            timestamp=timestamp
+        )
+        logger.debug(f"EOH mis à jour par ultrason: angle={bearing_deg:.1f}°, distance={distance:.2f}m")
\ No newline at end of file
@@ -2,18 +2,80 @@
 Module principal de navigation pour smart-glasses.
 Orchestre capteurs, perception, fusion et décision.
 """
+import copy
+import json
+import os
 import threading
 import queue
 import time
-import yaml
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from functools import lru_cache
 from enum import Enum
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Callable, Any
+from typing import Dict, List, Optional, Callable, Any, ClassVar
 import logging
 from datetime import datetime
 
+from ._compat import DATACLASS_SLOTS
+from .tts.coqui_tts_service import TTSJob
+
+try:
+    import orjson
+except ImportError:  # orjson optionnel : la télémetrie est alors écrite avec json
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+def _read_config(config_path):
+    """
+    Lit la configuration YAML (FileNotFoundError propagée si le fichier est absent).
+    
+    Le dict parsé est partagé par toutes les instances du processus tant que le
+    fichier n'a pas changé ; chaque appelant reçoit sa propre copie, qu'il peut modifier.
+    """
+    stat = os.stat(config_path)
+    return copy.deepcopy(_load_config(os.path.abspath(config_path),
+                                      stat.st_mtime_ns, stat.st_size))
+
+@lru_cache(maxsize=8)
+def _load_config(config_path, mtime_ns, size):
+    """
+    Parse le YAML, via un cache JSON voisin tant que le YAML n'a pas changé.
+    
+    Le cache est indexé sur (mtime_ns, taille) du YAML : une réécriture dans la même
+    seconde l'invalide aussi. Le résultat est partagé : ne pas le modifier.
+    """
+    version = [mtime_ns, size]
+    cache_path = config_path + '.cache.json'
+    
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('version') == version:
+            return cached['config']
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    
+    # PyYAML importé seulement si le cache JSON est absent ou périmé ;
+    # libyaml (C) si PyYAML a été compilé avec, sinon le chargeur pur Python
+    import yaml
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = yaml.load(f, Loader=loader)
+    
+    # Écriture atomique : un lecteur concurrent ne voit jamais un cache tronqué
+    try:
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': version, 'config': config}, f)
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError) as e:
+        logger.debug(f"Cache de configuration non écrit: {e}")
+    
+    return config
+
 class NavigationState(Enum):
     """États du module de navigation."""
     IDLE = "idle"
@@ -31,13 +93,13 @@ class Detection:
     bbox: tuple  # (x, y, w, h) normalisé [0,1]
     distance_estimate: Optional[float] = None  # en cm
     bearing: Optional[float] = None  # en degrés (-gauche, +droite)
-    timestamp: float = None
+    timestamp: float = None  # time.monotonic() de la frame
 
 @dataclass
 class UltrasonicReading:
     """Lecture du capteur ultrasonique."""
     distance_cm: float
-    timestamp: float
+    timestamp: float  # time.monotonic()
 
 @dataclass
 class Decision:
@@ -50,9 +112,154 @@ class Decision:
     confidence: float = 0.0
     new_state: Optional[NavigationState] = None
 
+class SPSCRing:
+    """
+    File bornée à un producteur et un consommateur, sans verrou côté put().
+    
+    Pleine, elle écrase l'élément le plus ancien : le consommateur reçoit toujours
+    les données les plus récentes. deque.append/popleft sont atomiques sous le GIL ;
+    l'Event ne sert qu'à réveiller le consommateur quand la file était vide.
+    Interface réduite de queue.Queue (get lève queue.Empty à l'expiration).
+    """
+    
+    def __init__(self, capacity: int):
+        self._items = deque(maxlen=capacity)
+        self._ready = threading.Event()
+    
+    def put(self, item):
+        self._items.append(item)
+        self._ready.set()
+    
+    def get(self, timeout: Optional[float] = None):
+        if not self._items:
+            # clear() avant le second test : un put() concurrent ne peut pas être perdu
+            self._ready.clear()
+            if not self._items and not self._ready.wait(timeout):
+                raise queue.Empty
+        return self.get_nowait()
+    
+    def get_nowait(self):
+        try:
+            return self._items.popleft()
+        except IndexError:
+            raise queue.Empty from None
+    
+    def qsize(self) -> int:
+        return len(self._items)
+    
+    def empty(self) -> bool:
+        return not self._items
+
+@dataclass(frozen=True, **DATACLASS_SLOTS)
+class NavConfig:
+    """
+    Paramètres lus par les boucles des threads, extraits une fois du YAML.
+    
+    Le dict self.config reste la source (composants, statut, calibration) :
+    cette vue est reconstruite à chaque modification de la configuration.
+    """
+    fov_deg: float
+    camera_height: int
+    frame_interval_s: float
+    ultrasonic_interval_s: float
+    association_window_s: float
+    emergency_dist_cm: float
+    alert_dist_cm: float
+    warning_dist_cm: float
+    min_vocal_interval_s: float
+    telemetry_interval_s: float
+    save_telemetry: bool
+    eoh_bins: int
+    
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any]) -> 'NavConfig':
+        """Construit la vue à partir du dict de configuration imbriqué."""
+        camera = config['camera']
+        thresholds = config['thresholds']
+        return cls(
+            fov_deg=camera['fov_deg'],
+            camera_height=camera['height'],
+            frame_interval_s=1.0 / camera['fps'],
+            ultrasonic_interval_s=1.0 / config['ultrasonic']['sample_rate_hz'],
+            association_window_s=config['fusion']['association_window_ms'] / 1000.0,
+            emergency_dist_cm=thresholds['emergency_dist_cm'],
+            alert_dist_cm=thresholds['alert_dist_cm'],
+            warning_dist_cm=thresholds['warning_dist_cm'],
+            min_vocal_interval_s=thresholds['min_vocal_interval_s'],
+            telemetry_interval_s=config['system']['telemetry_interval_s'],
+            save_telemetry=config['system']['save_telemetry'],
+            eoh_bins=config['fusion']['eoh_bins']
+        )
+
 class NavigationModule:
     """Module principal de navigation."""
     
+    # Configuration par défaut (copiée dans load_config si le YAML est absent)
+    _DEFAULT_CONFIG: ClassVar[Dict[str, Any]] = {
+        'camera': {
+            'fov_deg': 62.2,
+            'width': 1280,
+            'height': 720,
+            'fps': 10,
+            'rotation': 0
+        },
+        'ultrasonic': {
+            'trig_pin': 23,
+            'echo_pin': 24,
+            'sample_rate_hz': 15,
+            'max_distance_cm': 400,
+            'timeout_us': 30000
+        },
+        'detection': {
+            'model_path': 'models/yolov8n.pt',
+            'confidence_threshold': 0.5,
+            'iou_threshold': 0.3,
+            'classes': [0, 1, 2, 3, 5, 7],  # person, bicycle, car, motorcycle, bus, truck
+            'track': True
+        },
+        'fusion': {
+            'eoh_bins': 13,
+            'ema_alpha': 0.4,
+            'association_window_ms': 150,
+            'max_object_age_s': 2.0,
+            'min_confidence': 0.3
+        },
+        'thresholds': {
+            'emergency_dist_cm': 35,
+            'alert_dist_cm': 100,
+            'warning_dist_cm': 200,
+            'persist_ms': 300,
+            'min_vocal_interval_s': 2.5,
+            'recovery_time_s': 1.5
+        },
+        'guidance': {
+            'clear_path_threshold_cm': 150,
+            'min_safe_angle_deg': 20,
+            'preferred_direction': 'right'  # 'left' or 'right'
+        },
+        'tts': {
+            'model_name': 'tts_models/fr/mai/tacotron2-DDC',
+            'speaker_wav': None,
+            'use_cuda': False,
+            'cache_dir': 'tts_cache',
+            'preload_phrases': True
+        },
+        'system': {
+            'debug_mode': False,
+            'log_level': 'INFO',
+            'save_telemetry': True,
+            'telemetry_interval_s': 5
+        }
+    }
+    
+    # Niveaux de priorité TTS acceptés par force_announce
+    _PRIORITY_MAP: ClassVar[Dict[str, int]] = {
+        'emergency': 0,
+        'high': 1,
+        'medium': 2,
+        'low': 3
+    }
+    
     def __init__(self, config_path: str = "config/navigation.yaml"):
         """
         Initialise le module de navigation.
@@ -64,12 +271,20 @@ class NavigationModule:
         
         # États et contrôle
         self.state = NavigationState.IDLE
+        # Notifiée à chaque changement d'état (observateurs sans sondage)
+        self._state_cv = threading.Condition()
         self.running = False
+        # Listes de callbacks liées à des attributs (lues directement par les threads) ;
+        # self.callbacks référence les mêmes listes pour register_callback()
+        self._on_alert_cbs: List[Callable] = []
+        self._on_state_change_cbs: List[Callable] = []
+        self._on_telemetry_cbs: List[Callable] = []
+        self._on_guidance_cbs: List[Callable] = []
         self.callbacks = {
-            'on_alert': [],
-            'on_state_change': [],
-            'on_telemetry': [],
-            'on_guidance': []
+            'on_alert': self._on_alert_cbs,
+            'on_state_change': self._on_state_change_cbs,
+            'on_telemetry': self._on_telemetry_cbs,
+            'on_guidance': self._on_guidance_cbs
         }
         
         # Composants
@@ -81,12 +296,17 @@ class NavigationModule:
         self.tts_service = None
         self.object_detector = None
         
-        # Queues pour communication inter-threads
-        self.frame_queue = queue.Queue(maxsize=3)
-        self.ultra_queue = queue.Queue(maxsize=10)
-        self.detection_queue = queue.Queue(maxsize=5)
+        # Inférence déléguée à un worker par le thread de perception (0 ou 1 frame en cours)
+        self._detector_pool: Optional[ThreadPoolExecutor] = None
+        self._inference_pending = 0
+        
+        # Queues pour communication inter-threads (détection → fusion : un seul
+        # producteur et un seul consommateur, la donnée la plus récente prime)
+        # Seule la dernière lecture ultrason sert : emplacement unique au lieu d'une queue
+        # (affectation d'une référence, atomique sous le GIL)
+        self._latest_ultra: Optional[UltrasonicReading] = None
         self.tts_queue = queue.PriorityQueue(maxsize=20)
-        self.fusion_queue = queue.Queue(maxsize=5)
+        self.fusion_queue = SPSCRing(5)
         
         # Threads
         self.threads = []
@@ -116,71 +336,12 @@ class NavigationModule:
     def load_config(self, config_path: str):
         """Charge la configuration depuis un fichier YAML."""
         try:
-            with open(config_path, 'r') as f:
-                self.config = yaml.safe_load(f)
+            self.config = _read_config(config_path)
             logger.info(f"Configuration chargée depuis {config_path}")
         except FileNotFoundError:
             logger.warning(f"Fichier de configuration {config_path} non trouvé, utilisation des valeurs par défaut")
-            self.config = self._default_config()
-    
-    def _default_config(self):
-        """Configuration par défaut."""
-        return {
-            'camera': {
-                'fov_deg': 62.2,
-                'width': 1280,
-                'height': 720,
-                'fps': 10,
-                'rotation': 0
-            },
-            'ultrasonic': {
-                'trig_pin': 23,
-                'echo_pin': 24,
-                'sample_rate_hz': 15,
-                'max_distance_cm': 400,
-                'timeout_us': 30000
-            },
-            'detection': {
-                'model_path': 'models/yolov8n.pt',
-                'confidence_threshold': 0.5,
-                'iou_threshold': 0.3,
-                'classes': [0, 1, 2, 3, 5, 7],  # person, bicycle, car, motorcycle, bus, truck
-                'track': True
-            },
-            'fusion': {
-                'eoh_bins': 13,
-                'ema_alpha': 0.4,
-                'association_window_ms': 150,
-                'max_object_age_s': 2.0,
-                'min_confidence': 0.3
-            },
-            'thresholds': {
-                'emergency_dist_cm': 35,
-                'alert_dist_cm': 100,
-                'warning_dist_cm': 200,
-                'persist_ms': 300,
-                'min_vocal_interval_s': 2.5,
-                'recovery_time_s': 1.5
-            },
-            'guidance': {
-                'clear_path_threshold_cm': 150,
-                'min_safe_angle_deg': 20,
-                'preferred_direction': 'right'  # 'left' or 'right'
-            },
-            'tts': {
-                'model_name': 'tts_models/fr/mai/tacotron2-DDC',
-                'speaker_wav': None,
-                'use_cuda': False,
-                'cache_dir': 'tts_cache',
-                'preload_phrases': True
-            },
-            'system': {
-                'debug_mode': False,
-                'log_level': 'INFO',
-                'save_telemetry': True,
-                'telemetry_interval_s': 5
-            }
-        }
+            self.config = copy.deepcopy(self._DEFAULT_CONFIG)
+        self.cfg = NavConfig.from_dict(self.config)
     
     def start(self):
         """Démarre tous les composants du module."""
@@ -225,16 +386,16 @@ class NavigationModule:
             )
             
             self.eoh = EgocentricOccupancyHistogram(
-                bins=self.config['fusion']['eoh_bins'],
-                fov_deg=self.config['camera']['fov_deg'],
+                bins=self.cfg.eoh_bins,
+                fov_deg=self.cfg.fov_deg,
                 ema_alpha=self.config['fusion']['ema_alpha']
             )
             
             self.priority_engine = PriorityEngine(
-                emergency_dist=self.config['thresholds']['emergency_dist_cm'],
-                alert_dist=self.config['thresholds']['alert_dist_cm'],
-                warning_dist=self.config['thresholds']['warning_dist_cm'],
-                min_vocal_interval=self.config['thresholds']['min_vocal_interval_s']
+                emergency_dist=self.cfg.emergency_dist_cm,
+                alert_dist=self.cfg.alert_dist_cm,
+                warning_dist=self.cfg.warning_dist_cm,
+                min_vocal_interval=self.cfg.min_vocal_interval_s
             )
             
             self.guidance_planner = GuidancePlanner(
@@ -281,10 +442,12 @@ class NavigationModule:
     
     def _start_threads(self):
         """Démarre tous les threads de traitement."""
+        # Un seul worker : le modèle YOLO n'est pas réentrant
+        self._detector_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Nav-Inference")
+        
         threads_config = [
-            (self._camera_capture_loop, "CamCapture"),
+            (self._perception_loop, "Perception"),
             (self._ultrasonic_loop, "UltraSensor"),
-            (self._detection_loop, "Perception"),
             (self._fusion_loop, "Fusion"),
             (self._decision_loop, "Decision"),
             (self._guidance_loop, "Guidance"),
@@ -311,114 +474,93 @@ class NavigationModule:
         tts_thread.start()
         self.threads.append(tts_thread)
     
-    def _camera_capture_loop(self):
-        """Thread de capture vidéo."""
-        fps_counter = 0
-        last_fps_time = time.time()
+    def _perception_loop(self):
+        """
+        Thread ordonnanceur caméra → détection → fusion.
+        
+        L'inférence YOLO (qui libère le GIL) tourne dans le pool _detector_pool ; ce
+        thread garde toute la comptabilité Python (horodatage, FPS, bearings, latences,
+        statistiques), de sorte qu'aucun autre thread ne dispute le GIL pour elle.
+        Une frame reste en vol : la frame N+1 est acquise pendant l'inférence de N.
+        """
+        # Fenêtre glissante des 30 derniers instants de capture
+        frame_times = deque(maxlen=30)
+        frame_count = 0
+        detection_times = deque(maxlen=10)
+        in_flight = None  # (future, timestamp de la frame, début de l'inférence en ns)
         
         while self.running:
             try:
-                start_time = time.time()
+                # Frame N+1, acquise pendant que l'inférence de la frame N tourne
+                frame = self.camera_adapter.wait_frame(timeout=0.5)
+                
+                # Publier le résultat de la frame N avant de lancer la suivante
+                if in_flight is not None:
+                    future, timestamp, start_detect = in_flight
+                    try:
+                        detections = future.result(timeout=0.5)
+                    except FutureTimeout:
+                        continue  # Inférence trop lente : cette frame est abandonnée
+                    finally:
+                        if future.done():
+                            in_flight = None
+                            self._inference_pending = 0
+                    
+                    detection_times.append((time.monotonic_ns() - start_detect) * 1e-9)
+                    self.telemetry['latency']['detection'] = sum(detection_times) / len(detection_times)
+                    self._publish_detections(detections, timestamp)
                 
-                # Capturer une frame
-                frame = self.camera_adapter.capture_frame()
                 if frame is None:
-                    time.sleep(0.01)
                     continue
                 
-                # Ajouter timestamp
-                timestamp = time.time()
-                
-                # Mettre dans la queue (non bloquant)
-                try:
-                    self.frame_queue.put_nowait((frame, timestamp))
-                except queue.Full:
-                    # Jeter la frame la plus ancienne si nécessaire
-                    try:
-                        self.frame_queue.get_nowait()
-                        self.frame_queue.put_nowait((frame, timestamp))
-                    except queue.Empty:
-                        pass
-                
-                # Calcul FPS
-                fps_counter += 1
-                if time.time() - last_fps_time >= 1.0:
-                    self.telemetry['fps']['camera'] = fps_counter
-                    fps_counter = 0
-                    last_fps_time = time.time()
+                # Ajouter timestamp (horloge monotone, comme l'EOH)
+                timestamp = time.monotonic()
+                in_flight = (self._detector_pool.submit(self.object_detector.detect, frame),
+                             timestamp, time.monotonic_ns())
+                self._inference_pending = 1
                 
-                # Respecter le FPS configuré
-                elapsed = time.time() - start_time
-                target_delay = 1.0 / self.config['camera']['fps']
-                if elapsed < target_delay:
-                    time.sleep(target_delay - elapsed)
+                # Calcul FPS sur la fenêtre glissante (mis à jour toutes les 10 frames)
+                frame_times.append(timestamp)
+                frame_count += 1
+                if frame_count % 10 == 0:
+                    span = frame_times[-1] - frame_times[0]
+                    if span > 0:
+                        self.telemetry['fps']['camera'] = round((len(frame_times) - 1) / span, 1)
                     
             except Exception as e:
-                logger.error(f"Erreur dans camera_capture_loop: {e}")
+                logger.error(f"Erreur dans perception_loop: {e}", exc_info=True)
                 time.sleep(0.1)
     
-    def _detection_loop(self):
-        """Thread de détection d'objets."""
-        detection_times = []
+    def _publish_detections(self, detections: List[Detection], timestamp: float):
+        """Horodate les détections, calcule leurs bearings et les transmet à la fusion."""
+        # Ajouter timestamp
+        for det in detections:
+            det.timestamp = timestamp
         
-        while self.running:
-            try:
-                # Récupérer une frame
-                try:
-                    frame, timestamp = self.frame_queue.get(timeout=0.1)
-                except queue.Empty:
-                    continue
-                
-                start_detect = time.time()
-                
-                # Détection d'objets
-                detections = self.object_detector.detect(frame)
-                
-                # Ajouter timestamp et calculer bearing
-                for det in detections:
-                    det.timestamp = timestamp
-                    
-                    # Calculer le bearing (position angulaire)
-                    if det.bbox:
-                        center_x = det.bbox[0] + det.bbox[2] / 2
-                        # Convertir en degrés (-FOV/2 à +FOV/2)
-                        fov = self.config['camera']['fov_deg']
-                        det.bearing = (center_x - 0.5) * fov
-                
-                # Mesurer le temps de traitement
-                detection_time = time.time() - start_detect
-                detection_times.append(detection_time)
-                
-                # Garder seulement les 10 dernières mesures
-                if len(detection_times) > 10:
-                    detection_times.pop(0)
-                
-                # Calculer la latence moyenne
-                if detection_times:
-                    self.telemetry['latency']['detection'] = sum(detection_times) / len(detection_times)
-                
-                # Mettre dans la queue de fusion
-                try:
-                    self.fusion_queue.put_nowait((detections, timestamp))
-                except queue.Full:
-                    # Fusion est en retard, sauter cette frame
-                    pass
-                
-                # Mettre à jour les statistiques
-                self.stats['frames_processed'] += 1
-                self.stats['detections_count'] += len(detections)
-                
-            except Exception as e:
-                logger.error(f"Erreur dans detection_loop: {e}", exc_info=True)
-                time.sleep(0.1)
+        # Calculer les bearings (position angulaire) de toute la frame en une passe
+        with_bbox = [det for det in detections if det.bbox]
+        if with_bbox:
+            bboxes = np.array([det.bbox for det in with_bbox], dtype=np.float32)
+            # Centre horizontal converti en degrés (-FOV/2 à +FOV/2)
+            fov = self.cfg.fov_deg
+            bearings = (bboxes[:, 0] + bboxes[:, 2] * 0.5 - 0.5) * fov
+            for det, bearing in zip(with_bbox, bearings.tolist()):
+                det.bearing = bearing
+        
+        # Mettre dans la queue de fusion (si elle est en retard, la plus ancienne est écrasée)
+        self.fusion_queue.put((detections, timestamp))
+        
+        # Mettre à jour les statistiques
+        self.stats['frames_processed'] += 1
+        self.stats['detections_count'] += len(detections)
     
     def _ultrasonic_loop(self):
         """Thread de lecture du capteur ultrasonique."""
-        sample_interval = 1.0 / self.config['ultrasonic']['sample_rate_hz']
+        sample_interval = self.cfg.ultrasonic_interval_s
         
         while self.running:
             try:
-                start_time = time.time()
+                start_ns = time.monotonic_ns()
                 
                 # Lire la distance
                 distance = self.ultra_adapter.get_distance()
@@ -426,22 +568,14 @@ class NavigationModule:
                 # Créer la lecture
                 reading = UltrasonicReading(
                     distance_cm=distance,
-                    timestamp=time.time()
+                    timestamp=time.monotonic()
                 )
                 
-                # Mettre dans la queue
-                try:
-                    self.ultra_queue.put_nowait(reading)
-                except queue.Full:
-                    # Garder seulement la dernière lecture
-                    try:
-                        self.ultra_queue.get_nowait()
-                        self.ultra_queue.put_nowait(reading)
-                    except queue.Empty:
-                        pass
+                # Publier la dernière lecture (remplace la précédente)
+                self._latest_ultra = reading
                 
                 # Respecter le taux d'échantillonnage
-                elapsed = time.time() - start_time
+                elapsed = (time.monotonic_ns() - start_ns) * 1e-9
                 if elapsed < sample_interval:
                     time.sleep(sample_interval - elapsed)
                     
@@ -453,49 +587,52 @@ class NavigationModule:
         """Thread de fusion des données."""
         fusion_times = []
         last_ultra_reading = None
+        applied_ultra_reading = None
+        # Attente bloquante des détections, réveil au rythme du capteur ultrason au plus
+        ultra_interval = self.cfg.ultrasonic_interval_s
         
         while self.running:
             try:
-                start_fusion = time.time()
-                
-                # Récupérer la dernière lecture ultra
-                ultra_readings = []
-                while not self.ultra_queue.empty():
-                    ultra_readings.append(self.ultra_queue.get_nowait())
-                
-                if ultra_readings:
-                    last_ultra_reading = ultra_readings[-1]
-                
-                # Récupérer les détections
+                # Récupérer les détections (retour immédiat dès qu'une frame est prête)
                 try:
-                    detections, timestamp = self.fusion_queue.get(timeout=0.05)
+                    detections, timestamp = self.fusion_queue.get(timeout=ultra_interval)
                 except queue.Empty:
-                    # Pas de nouvelle détection
-                    if last_ultra_reading and time.time() - last_ultra_reading.timestamp < 0.5:
+                    # Pas de nouvelle détection : appliquer seulement une lecture ultra nouvelle
+                    latest_ultra = self._latest_ultra
+                    if (latest_ultra is not None and latest_ultra is not applied_ultra_reading
+                            and time.monotonic() - latest_ultra.timestamp < 0.5):
                         # Mettre à jour l'EOH avec seulement l'ultrason
                         self.eoh.update_ultrasound_only(
-                            distance=last_ultra_reading.distance_cm,
-                            timestamp=last_ultra_reading.timestamp
+                            distance=latest_ultra.distance_cm,
+                            timestamp=latest_ultra.timestamp
                         )
+                        applied_ultra_reading = latest_ultra
                     continue
                 
+                start_fusion = time.monotonic_ns()
+                
+                # Récupérer la dernière lecture ultra
+                latest_ultra = self._latest_ultra
+                if latest_ultra is not None:
+                    last_ultra_reading = latest_ultra
+                
                 # Fusionner les données
                 if last_ultra_reading:
-                    self._fuse_detections(detections, last_ultra_reading)
+                    self._fuse_detections(detections, last_ultra_reading, timestamp)
                 else:
-                    # Utiliser seulement les détections visuelles
-                    for detection in detections:
-                        if detection.bearing is not None:
-                            self.eoh.update(
-                                bearing=detection.bearing,
-                                distance=detection.distance_estimate or 200,  # Valeur par défaut
-                                confidence=detection.confidence,
-                                object_class=detection.class_name,
-                                timestamp=detection.timestamp
-                            )
+                    # Utiliser seulement les détections visuelles, en un seul appel à l'EOH
+                    visible = [d for d in detections if d.bearing is not None]
+                    if visible:
+                        self.eoh.update_many(
+                            bearings=[d.bearing for d in visible],
+                            distances=[d.distance_estimate or 200 for d in visible],  # Valeur par défaut
+                            confidences=[d.confidence for d in visible],
+                            object_classes=[d.class_name for d in visible],
+                            timestamp=timestamp
+                        )
                 
                 # Mesurer le temps de fusion
-                fusion_time = time.time() - start_fusion
+                fusion_time = (time.monotonic_ns() - start_fusion) * 1e-9
                 fusion_times.append(fusion_time)
                 
                 if len(fusion_times) > 10:
@@ -508,36 +645,41 @@ class NavigationModule:
                 logger.error(f"Erreur dans fusion_loop: {e}", exc_info=True)
                 time.sleep(0.05)
     
-    def _fuse_detections(self, detections: List[Detection], ultra_reading: UltrasonicReading):
+    def _fuse_detections(self, detections: List[Detection], ultra_reading: UltrasonicReading,
+                         timestamp: float):
         """Fusionne les détections vision et ultrasons."""
-        association_window = self.config['fusion']['association_window_ms'] / 1000.0
+        association_window = self.cfg.association_window_s
         
-        for detection in detections:
-            # Vérifier si la détection est récente
-            if abs(detection.timestamp - ultra_reading.timestamp) > association_window:
-                continue
-            
-            # Si l'objet est au centre (±15°), utiliser la distance ultrason
-            if detection.bearing and abs(detection.bearing) < 15:
-                detection.distance_estimate = ultra_reading.distance_cm
-                confidence_boost = 1.0  # Ultrason considéré comme très fiable
-            else:
-                # Estimer la distance basée sur la taille de l'objet
-                detection.distance_estimate = self._estimate_distance_from_bbox(
-                    detection.class_name,
-                    detection.bbox[3]  # height
-                )
-                confidence_boost = 0.7
-            
-            # Mettre à jour l'EOH
-            if detection.bearing is not None and detection.distance_estimate is not None:
-                self.eoh.update(
-                    bearing=detection.bearing,
-                    distance=detection.distance_estimate,
-                    confidence=detection.confidence * confidence_boost,
-                    object_class=detection.class_name,
-                    timestamp=detection.timestamp
-                )
+        # Toutes les détections portent le timestamp de la frame : un seul test de fraîcheur
+        if abs(timestamp - ultra_reading.timestamp) > association_window:
+            return
+        
+        located = [d for d in detections if d.bearing is not None]
+        if not located:
+            return
+        
+        count = len(located)
+        bearings = np.fromiter((d.bearing for d in located), dtype=np.float64, count=count)
+        confidences = np.fromiter((d.confidence for d in located), dtype=np.float64, count=count)
+        
+        # Objets au centre (±15°) : distance ultrason, considérée comme très fiable
+        central = np.abs(bearings) < 15
+        distances = np.full(count, ultra_reading.distance_cm, dtype=np.float64)
+        confidences *= np.where(central, 1.0, 0.7)
+        
+        # Ailleurs : estimer la distance basée sur la taille de l'objet
+        for i in np.flatnonzero(~central).tolist():
+            distances[i] = self._estimate_distance_from_bbox(
+                located[i].class_name,
+                located[i].bbox[3]  # height
+            )
+        
+        for detection, distance in zip(located, distances.tolist()):
+            detection.distance_estimate = distance
+        
+        # Mettre à jour l'EOH en une passe
+        self.eoh.update_many(bearings, distances, confidences,
+                             [d.class_name for d in located], timestamp=timestamp)
     
     def _estimate_distance_from_bbox(self, class_name: str, bbox_height: float) -> float:
         """Estime la distance basée sur la hauteur du bounding box."""
@@ -554,7 +696,7 @@ class NavigationModule:
         if class_name in reference_heights:
             ref_height = reference_heights[class_name]
             # Distance approximative = (hauteur de référence / hauteur détectée) * 100 cm
-            distance = (ref_height / (bbox_height * self.config['camera']['height'])) * 100
+            distance = (ref_height / (bbox_height * self.cfg.camera_height)) * 100
             return max(50, min(500, distance))  # Limiter entre 50cm et 5m
         else:
             return 200  # Distance par défaut
@@ -562,11 +704,14 @@ class NavigationModule:
     def _decision_loop(self):
         """Thread de prise de décision."""
         last_vocal_time = 0
-        last_decision_time = 0
         
         while self.running:
             try:
-                decision_start = time.time()
+                # Attendre une modification de l'EOH (au plus 100 ms, pour l'expiration des bins)
+                self.eoh.changed.wait(timeout=0.1)
+                self.eoh.changed.clear()
+                
+                decision_start = time.monotonic_ns()
                 
                 # Obtenir le snapshot actuel de l'EOH
                 snapshot = self.eoh.get_snapshot()
@@ -584,7 +729,7 @@ class NavigationModule:
                     # Vérifier le délai minimum entre messages
                     time_since_last_vocal = current_time - last_vocal_time
                     
-                    if time_since_last_vocal >= self.config['thresholds']['min_vocal_interval_s']:
+                    if time_since_last_vocal >= self.cfg.min_vocal_interval_s:
                         # Générer un message unique pour éviter les répétitions
                         message_hash = hash(decision.message)
                         
@@ -592,13 +737,10 @@ class NavigationModule:
                            current_time - self.recent_messages[message_hash] > 5.0:
                             
                             # Ajouter à la file TTS
-                            self.tts_queue.put((
-                                decision.priority,
-                                {
-                                    'text': decision.message,
-                                    'priority': decision.priority,
-                                    'timestamp': current_time
-                                }
+                            self.tts_queue.put(TTSJob(
+                                priority=decision.priority,
+                                text=decision.message,
+                                timestamp=current_time
                             ))
                             
                             last_vocal_time = current_time
@@ -606,29 +748,24 @@ class NavigationModule:
                             self.stats['warnings_issued'] += 1
                             
                             # Déclencher les callbacks
-                            self._trigger_callbacks('on_alert', {
-                                'type': decision.alert_type,
-                                'distance': snapshot.min_distance,
-                                'bearing': snapshot.closest_bearing,
-                                'suggested_action': decision.suggested_action,
-                                'confidence': decision.confidence,
-                                'timestamp': current_time
-                            })
+                            if self._on_alert_cbs:
+                                self._fire(self._on_alert_cbs, {
+                                    'type': decision.alert_type,
+                                    'distance': snapshot.min_distance,
+                                    'bearing': snapshot.closest_bearing,
+                                    'suggested_action': decision.suggested_action,
+                                    'confidence': decision.confidence,
+                                    'timestamp': current_time
+                                })
                 
                 # Mettre à jour l'état si nécessaire
                 if decision.new_state and decision.new_state != self.state:
                     self._set_state(decision.new_state)
                 
                 # Mesurer le temps de décision
-                decision_time = time.time() - decision_start
+                decision_time = (time.monotonic_ns() - decision_start) * 1e-9
                 self.telemetry['latency']['decision'] = decision_time
                 
-                # Contrôle de fréquence (10 Hz)
-                elapsed = time.time() - last_decision_time
-                if elapsed < 0.1:
-                    time.sleep(0.1 - elapsed)
-                last_decision_time = time.time()
-                
             except Exception as e:
                 logger.error(f"Erreur dans decision_loop: {e}", exc_info=True)
                 time.sleep(0.1)
@@ -670,17 +807,14 @@ class NavigationModule:
                         message = "Continuez prudemment"
                     
                     # Ajouter à la file TTS avec priorité moyenne
-                    self.tts_queue.put((
-                        2,  # Priorité moyenne
-                        {
-                            'text': message,
-                            'priority': 2,
-                            'timestamp': current_time
-                        }
+                    self.tts_queue.put(TTSJob(
+                        priority=2,  # Priorité moyenne
+                        text=message,
+                        timestamp=current_time
                     ))
                     
                     # Déclencher callback
-                    self._trigger_callbacks('on_guidance', guidance)
+                    self._fire(self._on_guidance_cbs, guidance)
                 
                 last_guidance_time = current_time
                 time.sleep(0.5)  # Vérifier toutes les 500ms
@@ -698,7 +832,14 @@ class NavigationModule:
                 current_time = time.time()
                 
                 # Envoyer la télémetrie à intervalle régulier
-                if current_time - last_telemetry_time >= self.config['system']['telemetry_interval_s']:
+                if current_time - last_telemetry_time >= self.cfg.telemetry_interval_s:
+                    last_telemetry_time = current_time
+                    
+                    # Personne ne consomme le snapshot : ne pas le construire
+                    if not self._on_telemetry_cbs and not self.cfg.save_telemetry:
+                        time.sleep(0.5)
+                        continue
+                    
                     # Mettre à jour la télémetrie
                     snapshot = self.eoh.get_snapshot()
                     
@@ -709,21 +850,19 @@ class NavigationModule:
                         'uptime': current_time - self.stats['start_time'],
                         'stats': self.stats.copy(),
                         'queue_sizes': {
-                            'frame': self.frame_queue.qsize(),
-                            'ultra': self.ultra_queue.qsize(),
+                            'frame': self._inference_pending,
+                            'ultra': int(self._latest_ultra is not None),
                             'fusion': self.fusion_queue.qsize(),
                             'tts': self.tts_queue.qsize()
                         }
                     })
                     
                     # Déclencher callback télémetrie
-                    self._trigger_callbacks('on_telemetry', self.telemetry)
+                    self._fire(self._on_telemetry_cbs, self.telemetry)
                     
                     # Sauvegarder si configuré
-                    if self.config['system']['save_telemetry']:
+                    if self.cfg.save_telemetry:
                         self._save_telemetry_snapshot()
-                    
-                    last_telemetry_time = current_time
                 
                 time.sleep(0.5)
                 
@@ -736,9 +875,8 @@ class NavigationModule:
         while self.running:
             try:
                 # Vérifier les files d'attente bloquantes
-                if (self.frame_queue.qsize() > 5 or 
-                    self.tts_queue.qsize() > 15):
-                    logger.warning(f"Files d'attente pleines: frame={self.frame_queue.qsize()}, tts={self.tts_queue.qsize()}")
+                if self.tts_queue.qsize() > 15:
+                    logger.warning(f"Files d'attente pleines: tts={self.tts_queue.qsize()}")
                 
                 # Vérifier la latence
                 if self.telemetry['latency']['detection'] > 0.3:
@@ -759,7 +897,6 @@ class NavigationModule:
     def _save_telemetry_snapshot(self):
         """Sauvegarde un snapshot de télémetrie (simplifié)."""
         try:
-            import json
             from pathlib import Path
             
             telemetry_dir = Path("telemetry")
@@ -767,48 +904,53 @@ class NavigationModule:
             
             filename = telemetry_dir / f"nav_telemetry_{int(time.time())}.json"
             
-            with open(filename, 'w') as f:
-                json.dump(self.telemetry, f, indent=2, default=str)
+            if orjson is not None:
+                with open(filename, 'wb') as f:
+                    f.write(orjson.dumps(self.telemetry, default=str,
+                                         option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+            else:
+                with open(filename, 'w') as f:
+                    json.dump(self.telemetry, f, indent=2, default=str)
             
         except Exception as e:
             logger.error(f"Erreur sauvegarde télémetrie: {e}")
     
     def _set_state(self, new_state: NavigationState):
         """Change l'état du module."""
-        if self.state != new_state:
-            old_state = self.state
+        old_state = self.state
+        if old_state is new_state:
+            return
+        with self._state_cv:
             self.state = new_state
-            
-            # Ajouter à l'historique
-            self.telemetry['state_history'].append({
-                'old_state': old_state.value,
-                'new_state': new_state.value,
-                'timestamp': time.time()
-            })
-            
-            # Garder seulement les 50 derniers états
-            if len(self.telemetry['state_history']) > 50:
-                self.telemetry['state_history'] = self.telemetry['state_history'][-50:]
-            
+            self._state_cv.notify_all()
+        
+        # Ajouter à l'historique (la même entrée sert aux callbacks)
+        change = {
+            'old_state': old_state.value,
+            'new_state': new_state.value,
+            'timestamp': time.time()
+        }
+        history = self.telemetry['state_history']
+        history.append(change)
+        
+        # Garder seulement les 50 derniers états
+        if len(history) > 50:
+            del history[:-50]
+        
+        if logger.isEnabledFor(logging.INFO):
             logger.info(f"État changé: {old_state.value} -> {new_state.value}")
-            
-            # Déclencher callback
-            self._trigger_callbacks('on_state_change', {
-                'old_state': old_state.value,
-                'new_state': new_state.value,
-                'timestamp': time.time()
-            })
-    
-    def _trigger_callbacks(self, event_name: str, data: Dict):
-        """Déclenche tous les callbacks pour un événement."""
-        if event_name not in self.callbacks:
-            return
         
-        for callback in self.callbacks[event_name]:
+        # Déclencher callback (seulement s'il y a des abonnés)
+        if self._on_state_change_cbs:
+            self._fire(self._on_state_change_cbs, change)
+    
+    def _fire(self, callbacks: List[Callable], data: Dict):
+        """Déclenche tous les callbacks d'une liste."""
+        for callback in callbacks:
             try:
                 callback(data)
             except Exception as e:
-                logger.error(f"Erreur dans callback {event_name}: {e}")
+                logger.error(f"Erreur dans callback {getattr(callback, '__name__', callback)}: {e}")
     
     def register_callback(self, event_name: str, callback: Callable):
         """Enregistre un callback pour un événement."""
@@ -847,6 +989,7 @@ class NavigationModule:
         """Calibre les paramètres de la caméra."""
         if 'fov_deg' in camera_params:
             self.config['camera']['fov_deg'] = camera_params['fov_deg']
+            self.cfg = NavConfig.from_dict(self.config)
             if self.eoh:
                 self.eoh.fov = camera_params['fov_deg']
         
@@ -871,11 +1014,11 @@ class NavigationModule:
                 if key in ['emergency_dist_cm', 'alert_dist_cm', 'warning_dist_cm', 'min_vocal_interval_s']:
                     if self.priority_engine:
                         if key == 'emergency_dist_cm':
-                            self.priority_engine.emergency_dist = value
+                            self.priority_engine.set_thresholds(emergency_dist=value)
                         elif key == 'alert_dist_cm':
-                            self.priority_engine.alert_dist = value
+                            self.priority_engine.set_thresholds(alert_dist=value)
                         elif key == 'warning_dist_cm':
-                            self.priority_engine.warning_dist = value
+                            self.priority_engine.set_thresholds(warning_dist=value)
                         elif key == 'min_vocal_interval_s':
                             self.priority_engine.min_vocal_interval = value
                 
@@ -883,6 +1026,7 @@ class NavigationModule:
                 updated = True
         
         if updated:
+            self.cfg = NavConfig.from_dict(self.config)
             return True
         else:
             logger.warning(f"Aucun seuil reconnu dans: {thresholds.keys()}")
@@ -890,23 +1034,13 @@ class NavigationModule:
     
     def force_announce(self, text: str, priority: str = 'medium'):
         """Force l'annonce d'un message (debug/manuel)."""
-        priority_map = {
-            'emergency': 0,
-            'high': 1,
-            'medium': 2,
-            'low': 3
-        }
-        
-        priority_level = priority_map.get(priority, 2)
+        priority_level = self._PRIORITY_MAP.get(priority, 2)
         
-        self.tts_queue.put((
-            priority_level,
-            {
-                'text': text,
-                'priority': priority_level,
-                'timestamp': time.time(),
-                'forced': True
-            }
+        self.tts_queue.put(TTSJob(
+            priority=priority_level,
+            text=text,
+            timestamp=time.time(),
+            forced=True
         ))
         
         logger.info(f"Message forcé: '{text}' (priorité: {priority})")
@@ -915,24 +1049,15 @@ class NavigationModule:
     
     def get_sensor_data(self) -> Dict:
         """Retourne les dernières données des capteurs (debug)."""
-        ultra_data = []
-        while not self.ultra_queue.empty():
-            ultra_data.append(self.ultra_queue.get_nowait())
-        
-        # Remettre les données dans la queue
-        for data in ultra_data:
-            try:
-                self.ultra_queue.put_nowait(data)
-            except queue.Full:
-                pass
+        last_reading = self._latest_ultra
         
         return {
             'ultrasonic': {
-                'last_reading': ultra_data[-1] if ultra_data else None,
-                'queue_size': self.ultra_queue.qsize()
+                'last_reading': last_reading,
+                'queue_size': int(last_reading is not None)
             },
             'camera': {
-                'queue_size': self.frame_queue.qsize(),
+                'queue_size': self._inference_pending,
                 'fps': self.telemetry['fps']['camera']
             },
             'detection': {
@@ -965,9 +1090,13 @@ class NavigationModule:
         if self.tts_service:
             self.tts_service.stop()
         
+        # Ne pas attendre l'inférence en cours : le thread de perception s'arrête seul
+        if self._detector_pool:
+            self._detector_pool.shutdown(wait=False)
+        
         # Vider les queues
-        queues = [self.frame_queue, self.ultra_queue, self.detection_queue, 
-                  self.fusion_queue, self.tts_queue]
+        self._latest_ultra = None
+        queues = [self.fusion_queue, self.tts_queue]
         
         for q in queues:
             while not q.empty():
@@ -3,11 +3,62 @@ Wrapper pour OCR (Tesseract) pour la lecture de texte.
 Optionnel pour la reconnaissance de panneaux.
 """
 import logging
+import re
 from typing import Optional, List, Tuple
 import numpy as np
 
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick optionnel : expression régulière compilée sinon
+    ahocorasick = None
+
 logger = logging.getLogger(__name__)
 
+# Mots-clés de panneaux par ordre de priorité : si un texte en contient plusieurs,
+# le premier de la liste l'emporte
+SIGN_KEYWORDS = {
+    'sortie': 'exit',
+    'exit': 'exit',
+    'escalier': 'stairs',
+    'stairs': 'stairs',
+    'toilette': 'toilet',
+    'toilet': 'toilet',
+    'homme': 'male_toilet',
+    'femme': 'female_toilet',
+    'ascenseur': 'elevator',
+    'elevator': 'elevator',
+    'danger': 'danger',
+    'attention': 'warning'
+}
+_SIGN_RANK = {keyword: rank for rank, keyword in enumerate(SIGN_KEYWORDS)}
+_sign_matcher = None
+
+def _get_sign_matcher():
+    """Fonction texte → mots-clés présents, en une passe (construite une seule fois)."""
+    global _sign_matcher
+    if _sign_matcher is None:
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for keyword in SIGN_KEYWORDS:
+                automaton.add_word(keyword, keyword)
+            automaton.make_automaton()
+            _sign_matcher = lambda text: [keyword for _, keyword in automaton.iter(text)]
+        else:
+            # Lookahead : toutes les occurrences, même chevauchantes
+            pattern = re.compile('(?=(' + '|'.join(map(re.escape, SIGN_KEYWORDS)) + '))')
+            _sign_matcher = pattern.findall
+    return _sign_matcher
+
+# OpenCV importé au premier appel de detect_text, pas à l'import du module
+_cv2 = None
+
+def _get_cv2():
+    global _cv2
+    if _cv2 is None:
+        import cv2
+        _cv2 = cv2
+    return _cv2
+
 class OCRWrapper:
     """Wrapper pour la reconnaissance de texte."""
     
@@ -23,6 +74,10 @@ class OCRWrapper:
         self.config = config
         self.tesseract = None
         
+        # Tampons de prétraitement réutilisés d'une frame à l'autre
+        self._gray_buf = None
+        self._bin_buf = None
+        
         self._initialize_tesseract()
     
     def _initialize_tesseract(self):
@@ -58,22 +113,32 @@ class OCRWrapper:
             return []
         
         try:
-            import cv2
+            cv2 = _get_cv2()
+            
+            # Découper la ROI avant le prétraitement : le seuillage adaptatif étant local,
+            # le résultat est le même que sur l'image entière, pour une fraction du travail
+            if roi is not None:
+                x, y, w, h = roi
+                image = image[y:y+h, x:x+w]
+            
+            # (Ré)allouer les tampons seulement si la taille de l'image change
+            shape = image.shape[:2]
+            if self._gray_buf is None or self._gray_buf.shape != shape or self._gray_buf.dtype != image.dtype:
+                self._gray_buf = np.empty(shape, dtype=image.dtype)
+                self._bin_buf = np.empty_like(self._gray_buf)
             
             # Convertir en niveaux de gris si nécessaire
             if len(image.shape) == 3:
-                gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+                gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY, dst=self._gray_buf)
             else:
                 gray = image
             
-            # Appliquer un prétraitement pour améliorer l'OCR
-            gray = cv2.medianBlur(gray, 3)
-            gray = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
-            
-            # Découper la ROI si spécifiée
-            if roi is not None:
-                x, y, w, h = roi
-                gray = gray[y:y+h, x:x+w]
+            # Binarisation adaptative gaussienne : lissage et seuillage en une seule passe
+            # (au lieu de médian + Otsu). Sur une très petite région le seuillage ne fait
+            # qu'ajouter du bruit : l'image en niveaux de gris est utilisée telle quelle
+            if shape[0] >= 64 and shape[1] >= 64:
+                gray = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                             cv2.THRESH_BINARY, 11, 2, dst=self._bin_buf)
             
             # Exécuter l'OCR
             data = self.tesseract.image_to_data(
@@ -83,16 +148,19 @@ class OCRWrapper:
                 output_type=self.tesseract.Output.DICT
             )
             
-            # Filtrer les détections avec une confiance suffisante
+            # Filtrer les détections avec une confiance suffisante (un seul masque
+            # vectorisé ; seuls les tokens retenus sont parcourus en Python)
+            conf = np.asarray(data['conf'], dtype=np.float32)
+            keep = np.flatnonzero(conf > 60)  # Seuil de confiance
+            
             detections = []
-            for i in range(len(data['text'])):
+            for i in keep.tolist():
                 text = data['text'][i].strip()
-                confidence = float(data['conf'][i])
                 
-                if text and confidence > 60:  # Seuil de confiance
+                if text:
                     detection = {
                         'text': text,
-                        'confidence': confidence / 100.0,  # Normaliser à [0, 1]
+                        'confidence': float(conf[i]) / 100.0,  # Normaliser à [0, 1]
                         'bbox': (
                             data['left'][i],
                             data['top'][i],
@@ -120,28 +188,13 @@ class OCRWrapper:
         
         # Filtrer les textes qui pourraient être des panneaux
         signs = []
-        keywords = {
-            'sortie': 'exit',
-            'exit': 'exit',
-            'escalier': 'stairs',
-            'stairs': 'stairs',
-            'toilette': 'toilet',
-            'toilet': 'toilet',
-            'homme': 'male_toilet',
-            'femme': 'female_toilet',
-            'ascenseur': 'elevator',
-            'elevator': 'elevator',
-            'danger': 'danger',
-            'attention': 'warning'
-        }
+        matcher = _get_sign_matcher()
         
         for detection in text_detections:
-            text_lower = detection['text'].lower()
-            for keyword, sign_type in keywords.items():
-                if keyword in text_lower:
-                    detection['sign_type'] = sign_type
-                    signs.append(detection)
-                    break
+            keyword = min(matcher(detection['text'].lower()), key=_SIGN_RANK.__getitem__, default=None)
+            if keyword is not None:
+                detection['sign_type'] = SIGN_KEYWORDS[keyword]
+                signs.append(detection)
         
         return signs
     
@@ -24,13 +24,17 @@ def main():
         print("Module démarré. Surveillance en cours...")
         print("Appuyez sur Ctrl+C pour arrêter\n")
         
-        # Monitor
-        for i in range(30):  # 30 secondes de test
+        # Monitor : réveil dès un changement d'état, au plus toutes les secondes
+        start_time = time.monotonic()
+        elapsed = 0.0
+        while elapsed < 30:  # 30 secondes de test
+            with nav._state_cv:
+                nav._state_cv.wait(timeout=min(1.0, 30 - elapsed))
             state = nav.get_state()
+            elapsed = time.monotonic() - start_time
             print(f"\r📊 État: {state['module_state']:10} | "
                   f"Distance: {state['eoh_snapshot']['min_distance'] or '---':6}cm | "
-                  f"Temps: {i+1}/30s", end='', flush=True)
-            time.sleep(1)
+                  f"Temps: {elapsed:4.1f}/30s", end='', flush=True)
         
         print("\n\nTest terminé avec succès!")
         